@@ -7,8 +7,13 @@ import pyroomacoustics as pra
 import numpy as np
 from scipy.io import wavfile
 from scipy import signal
+from scipy.spatial import ConvexHull, QhullError
 import os
 import matplotlib
+try:
+    import soundfile as sf  # optional: decodes straight to float32
+except ImportError:
+    sf = None
 matplotlib.use('Agg')  # Use non-interactive backend
 import matplotlib.pyplot as plt
 
@@ -17,11 +22,209 @@ SIZE_REDUCTION_FACTOR = 700.0  # to get a realistic room size (not 3km)
 # Configurable sound source file - change this to use different audio for simulation
 SOUND_SOURCE_FILE = 'sounds/sources/test_sound.wav'
 
+# Wall material used by simulate(); its coefficient tables never change, so build them once
+_DEFAULT_MATERIAL = pra.Material(energy_absorption=0.2, scattering=0.1)
+_EA = _DEFAULT_MATERIAL.energy_absorption["coeffs"]
+_SC = _DEFAULT_MATERIAL.scattering["coeffs"]
+
+
+def gather_wall_vertices(walls_from_render, model_vertices, scale_factor):
+    """
+    Gather the scaled vertices of every triangle referenced by the renderer's walls.
+
+    Args:
+        walls_from_render: List of wall dictionaries with triangle indices
+        model_vertices: Flattened (n_triangles * 3, 3) vertex array from the 3D model
+        scale_factor: Multiplier applied to every vertex coordinate
+
+    Returns:
+        tuple: (corners, n_skipped, n_degenerate) where corners is a C-contiguous
+        float32 array of shape (N, 3, 3) as (triangle, xyz, vertex), so corners[i]
+        is the (3, 3) column layout pra.wall_factory expects, n_skipped counts
+        out-of-range triangles and n_degenerate counts dropped zero-area triangles
+    """
+    tri_ids = np.fromiter(
+        (t for wall_info in walls_from_render for t in wall_info['triangles']),
+        dtype=np.int64,
+    )
+
+    # A triangle needs all three of its vertices inside the vertex array
+    valid = (tri_ids >= 0) & (tri_ids * 3 + 3 <= len(model_vertices))
+    n_skipped = int(tri_ids.size - np.count_nonzero(valid))
+    tri_ids = tri_ids[valid]
+
+    idx = (tri_ids[:, None] * 3 + np.arange(3)).ravel()
+    verts = model_vertices[idx].reshape(-1, 3, 3).astype(np.float32, copy=False)
+    verts = verts * np.float32(scale_factor)
+
+    # Zero-area triangles add walls without contributing any reflecting surface
+    area2 = np.linalg.norm(np.cross(verts[:, 1] - verts[:, 0], verts[:, 2] - verts[:, 0]), axis=1)
+    keep = area2 > 1e-10
+    n_degenerate = int(keep.size - np.count_nonzero(keep))
+    verts = verts[keep]
+
+    # One allocation for all walls; libroom reads float32 so no further conversion
+    corners = np.ascontiguousarray(verts.transpose(0, 2, 1))
+    return corners, n_skipped, n_degenerate
+
+
+def merge_coplanar_triangles(corners):
+    """
+    Merge one surface's triangles into a single convex polygon when possible.
+
+    The triangles are merged only if they lie in one plane with the same
+    orientation and exactly tile their convex hull. Otherwise they are
+    returned unchanged, one polygon per triangle.
+
+    Args:
+        corners: (N, 3, 3) float32 array as (triangle, xyz, vertex)
+
+    Returns:
+        list: (3, K) float32 corner arrays, one per wall
+    """
+    if len(corners) < 2:
+        return list(corners)
+
+    tris = corners.transpose(0, 2, 1).astype(np.float64)
+    cross = np.cross(tris[:, 1] - tris[:, 0], tris[:, 2] - tris[:, 0])
+    cross_len = np.linalg.norm(cross, axis=1)
+    normal = cross.sum(axis=0)
+    normal_len = np.linalg.norm(normal)
+    if normal_len == 0.0:
+        return list(corners)
+    normal /= normal_len
+
+    # Every triangle must face the same way and sit on the same plane
+    pts = tris.reshape(-1, 3)
+    extent = np.ptp(pts, axis=0).max()
+    if np.any(cross @ normal < cross_len * (1.0 - 1e-6)):
+        return list(corners)
+    if np.abs((pts - pts[0]) @ normal).max() > 1e-5 * extent:
+        return list(corners)
+
+    # In-plane basis with u x v == normal, so a CCW hull keeps the wall orientation
+    axis = np.zeros(3)
+    axis[np.argmin(np.abs(normal))] = 1.0
+    u = np.cross(normal, axis)
+    u /= np.linalg.norm(u)
+    v = np.cross(normal, u)
+    try:
+        hull = ConvexHull(pts @ np.column_stack((u, v)))
+    except QhullError:
+        return list(corners)
+
+    # Concave or holed surfaces cover less than their hull
+    area = 0.5 * cross_len.sum()
+    if abs(hull.volume - area) > 1e-4 * hull.volume:
+        return list(corners)
+
+    return [np.ascontiguousarray(pts[hull.vertices].T, dtype=np.float32)]
+
+
+def build_wall_polygons(walls_from_render, model_vertices, scale_factor):
+    """
+    Build pyroomacoustics wall corners for the renderer's surfaces.
+
+    Each surface becomes a single convex polygon when its triangles allow it
+    (see merge_coplanar_triangles), otherwise one wall per triangle.
+
+    Args:
+        walls_from_render: List of wall dictionaries with triangle indices
+        model_vertices: Flattened (n_triangles * 3, 3) vertex array from the 3D model
+        scale_factor: Multiplier applied to every vertex coordinate
+
+    Returns:
+        tuple: (polygons, n_triangles, n_skipped, n_degenerate) where polygons is a
+        list of (3, K) float32 corner arrays and the counts are as in gather_wall_vertices
+    """
+    polygons = []
+    n_triangles = n_skipped = n_degenerate = 0
+    for wall_info in walls_from_render:
+        corners, skipped, degenerate = gather_wall_vertices([wall_info], model_vertices, scale_factor)
+        n_triangles += len(corners)
+        n_skipped += skipped
+        n_degenerate += degenerate
+        polygons.extend(merge_coplanar_triangles(corners))
+    return polygons, n_triangles, n_skipped, n_degenerate
+
+
+def adaptive_n_rays(volume, min_rays=500, max_rays=10000):
+    """
+    Pick a ray-tracing budget that grows with the room's linear size.
+
+    Args:
+        volume: Room volume in cubic meters
+        min_rays: Lower bound on the number of rays
+        max_rays: Upper bound on the number of rays
+
+    Returns:
+        int: Number of rays to trace
+    """
+    return int(np.clip(500 * max(volume, 0.0) ** (1 / 3), min_rays, max_rays))
+
+
+def to_pcm16(samples, gain=1.0):
+    """
+    Convert float samples to int16 PCM, saturating instead of wrapping on overflow.
+
+    Args:
+        samples: Float signal, nominally in [-1, 1] after applying gain
+        gain: Scalar applied to the samples before conversion
+
+    Returns:
+        np.ndarray: int16 samples
+    """
+    # Scale, clip and round in place on a single float32 buffer
+    scaled = np.multiply(samples, np.float32(gain * 32767.0), dtype=np.float32)
+    np.clip(scaled, -32768.0, 32767.0, out=scaled)
+    np.rint(scaled, out=scaled)
+    return scaled.astype(np.int16)
+
+
 class Acoustic(pra.room.Room):
 
+    # Decoded source signals keyed by (path, mtime), shared across simulate() calls
+    _signal_cache = {}
+
     def __init__(self):
         self.sample_rate = 44100
         self.speed_of_sound = 343.0
+        self.debug_plots = False  # plot the RIRs during simulate() (slow, debugging only)
+    
+    @classmethod
+    def load_source_signal(cls, source_file):
+        """
+        Load a sound source as a mono float32 signal, reusing earlier decodes.
+        
+        Args:
+            source_file: Path to the WAV file
+            
+        Returns:
+            tuple: (sample_rate, signal). The signal is shared with the cache
+            and must not be modified in place.
+        """
+        key = (source_file, os.path.getmtime(source_file))
+        cached = cls._signal_cache.get(key)
+        if cached is not None:
+            return cached
+        
+        if sf is not None:
+            signal, fs = sf.read(source_file, dtype='float32', always_2d=False)
+            # Ensure signal is mono (1D array)
+            if signal.ndim > 1:
+                signal = np.ascontiguousarray(signal[:, 0])  # Take first channel if stereo
+        else:
+            fs, raw = wavfile.read(source_file)
+            
+            # Ensure signal is mono (1D array)
+            if raw.ndim > 1:
+                raw = raw[:, 0]  # Take first channel if stereo
+            
+            # Cast and scale in one pass
+            signal = np.multiply(raw, np.float32(1.0 / 32768.0), dtype=np.float32)  # required.
+        
+        cls._signal_cache[key] = (fs, signal)
+        return fs, signal
     
     def generate_spectrogram_comparison(self, original_file, output_file, sample_rate, output_dir):
         """
@@ -56,16 +259,19 @@ class Acoustic(pra.room.Room):
         fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 8))
         
         # Generate spectrograms
-        # Use shorter segments for better frequency resolution
-        nperseg = min(1024, len(original) // 4)
+        # Use shorter segments for better frequency resolution; both spectrograms
+        # share one segment length and a float32 window so the FFTs stay single precision
+        nperseg = min(1024, min(len(original), len(simulated)) // 4)
+        noverlap = nperseg // 8
+        window = signal.get_window('hann', nperseg).astype(np.float32)
         
         # Original audio spectrogram
         f_orig, t_orig, Sxx_orig = signal.spectrogram(
-            original, fs_orig, nperseg=nperseg, 
-            window='hann', scaling='density'
+            original.astype(np.float32, copy=False), fs_orig, window=window,
+            nperseg=nperseg, noverlap=noverlap, detrend=False, scaling='density'
         )
         ax1.pcolormesh(t_orig, f_orig, 10 * np.log10(Sxx_orig + 1e-10), 
-                       shading='gouraud', cmap='viridis')
+                       shading='auto', cmap='viridis')
         ax1.set_ylabel('Frequency [Hz]')
         ax1.set_xlabel('Time [s]')
         ax1.set_title('Original Audio Spectrogram')
@@ -73,11 +279,11 @@ class Acoustic(pra.room.Room):
         
         # Simulated audio spectrogram
         f_sim, t_sim, Sxx_sim = signal.spectrogram(
-            simulated, fs_out, nperseg=nperseg,
-            window='hann', scaling='density'
+            simulated.astype(np.float32, copy=False), fs_out, window=window,
+            nperseg=nperseg, noverlap=noverlap, detrend=False, scaling='density'
         )
         ax2.pcolormesh(t_sim, f_sim, 10 * np.log10(Sxx_sim + 1e-10), 
-                       shading='gouraud', cmap='viridis')
+                       shading='auto', cmap='viridis')
         ax2.set_ylabel('Frequency [Hz]')
         ax2.set_xlabel('Time [s]')
         ax2.set_title('Simulated Audio Spectrogram (with Room Acoustics)')
@@ -93,7 +299,8 @@ class Acoustic(pra.room.Room):
         
         return spectrogram_file
 
-    def simulate(self, walls_from_render, room_center, model_vertices, scale_factor=None, sound_source_file=None):
+    def simulate(self, walls_from_render, room_center, model_vertices, scale_factor=None, sound_source_file=None,
+                 max_duration_s=None):
         """
         Simulate acoustics in the given room geometry.
         
@@ -103,6 +310,8 @@ class Acoustic(pra.room.Room):
             model_vertices: Flattened vertex array from the 3D model
             scale_factor: Optional scale factor for the model. If None, uses SIZE_REDUCTION_FACTOR
             sound_source_file: Optional path to custom sound source file. If None, uses SOUND_SOURCE_FILE
+            max_duration_s: Optional cap on the source length in seconds. Convolution
+                cost grows with the signal length, so long recordings can be trimmed
             
         Returns:
             str: Path to the output audio file
@@ -135,53 +344,37 @@ class Acoustic(pra.room.Room):
         if len(model_vertices) == 0:
             raise ValueError("No vertices provided for acoustic simulation")
         
-        material = pra.Material(energy_absorption=0.2, scattering=0.1)
-
-        # create one wall per triangle from the renderer's grouped walls
-        walls = []
-        triangles_processed = 0
-        for wall_info in walls_from_render:
-            for tri_idx in wall_info['triangles']:
-                # Get the vertices for this triangle
-                triangle_verts = model_vertices[tri_idx*3 : tri_idx*3+3]
-
-                # pra.wall_factory expects vertices in shape (3, N)
-                # and they should be scaled down.
-                if triangle_verts.shape[0] < 3:
-                    print(f"  Warning: Skipping triangle {tri_idx} - insufficient vertices")
-                    continue
-
-                pra_vertices = triangle_verts.T * scale_factor
-                triangles_processed += 1
-                
-                walls.append(
-                    pra.wall_factory(
-                        pra_vertices,
-                        material.energy_absorption["coeffs"],
-                        material.scattering["coeffs"],
-                    )
-                )
-        
-        print(f'Created {len(walls)} walls from {triangles_processed} triangles')
+        # create one wall per flat surface (or per triangle) from the renderer's grouped walls
+        polygons, n_triangles, n_skipped, n_degenerate = build_wall_polygons(
+            walls_from_render, model_vertices, scale_factor
+        )
+        if n_skipped:
+            print(f"  Warning: Skipped {n_skipped} triangles - insufficient vertices")
+        if n_degenerate:
+            print(f"  Skipped {n_degenerate} degenerate (zero-area) triangles")
+
+        # each polygon is already in the (3, N) shape pra.wall_factory expects
+        ea, sc, wall_factory = _EA, _SC, pra.wall_factory
+        walls = [wall_factory(corners, ea, sc) for corners in polygons]
+
+        print(f'Created {len(walls)} walls from {n_triangles} triangles')
         
         if len(walls) == 0:
             raise ValueError("No valid walls created from the 3D model")
 
-        fs, signal = wavfile.read(source_file)
-        signal = signal.astype(np.float32) / 32768.0  # required.
-        
-        # Ensure signal is mono (1D array)
-        if signal.ndim > 1:
-            signal = signal[:, 0]  # Take first channel if stereo
+        fs, signal = self.load_source_signal(source_file)
+        if max_duration_s is not None:
+            signal = signal[:int(max_duration_s * fs)]
         
         cent = room_center * scale_factor
         print('Room center: ', cent)
 
         # Create microphone positions (two mics separated along Y axis)
         # TODO: make this a single microphone
-        mic1_pos = cent + np.array([0, 2, 0]) * scale_factor
-        mic2_pos = cent + np.array([0, -2, 0]) * scale_factor
-        mic_array = np.c_[mic1_pos, mic2_pos]
+        offset = np.array([0.0, 2.0 * scale_factor, 0.0])
+        mic_array = np.empty((3, 2), dtype=np.float64)
+        mic_array[:, 0] = cent + offset
+        mic_array[:, 1] = cent - offset
         
         print(f'Microphone array shape: {mic_array.shape}')
         print(f'Signal shape: {signal.shape}')
@@ -198,9 +391,6 @@ class Acoustic(pra.room.Room):
             .add_microphone_array(mic_array)
         )
         
-        # Set the number of rays manually to avoid calculation errors
-        room.set_ray_tracing(n_rays=1000)
-
         print('Room volume: ', room.volume)
         
         # Validate room was created successfully
@@ -213,6 +403,11 @@ class Acoustic(pra.room.Room):
             print("This may indicate an open mesh (e.g., pyramid without bottom face)")
             print("PyRoomAcoustics requires closed meshes for proper simulation")
 
+        # Set the number of rays manually to avoid calculation errors
+        n_rays = adaptive_n_rays(room.volume)
+        print(f'Ray tracing with {n_rays} rays')
+        room.set_ray_tracing(n_rays=n_rays)
+
         try:
             # compute the rir
             print('Image source model')
@@ -224,8 +419,10 @@ class Acoustic(pra.room.Room):
             print('Compute RIR')
             room.compute_rir()
             
-            print('Plotting RIR')
-            room.plot_rir()
+            if self.debug_plots:
+                print('Plotting RIR')
+                fig, _ = room.plot_rir()
+                plt.close(fig)
 
             print('Simulating room acoustics')
             room.simulate()
@@ -254,14 +451,11 @@ class Acoustic(pra.room.Room):
         # Get the simulated signal from the first microphone
         simulated_signal = room.mic_array.signals[0, :]
         
-        # Normalize the signal to prevent clipping
-        # The simulated signal is in float format, normalize to [-1, 1] range
+        # Normalize the signal to prevent clipping (with some headroom) and
+        # convert to int16 [-32768, 32767] for the WAV file in a single pass
         max_val = np.abs(simulated_signal).max()
-        if max_val > 0:
-            simulated_signal = simulated_signal / max_val * 0.95  # Leave some headroom
-        
-        # Convert from float32 [-1, 1] to int16 [-32768, 32767] for WAV file
-        simulated_signal_int16 = np.int16(simulated_signal * 32767)
+        gain = 0.95 / max_val if max_val > 0 else 0.0
+        simulated_signal_int16 = to_pcm16(simulated_signal, gain)
         
         print(f'Audio stats: min={simulated_signal_int16.min()}, max={simulated_signal_int16.max()}, length={len(simulated_signal_int16)}')
         
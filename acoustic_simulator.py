@@ -11,11 +11,9 @@ from datetime import datetime
 import os
 import json
 
+from acoustic import SIZE_REDUCTION_FACTOR, adaptive_n_rays, build_wall_polygons, to_pcm16
 from scene_manager import SceneManager, SoundSource, Listener
 
-# Same scaling factor as acoustic.py
-SIZE_REDUCTION_FACTOR = 700.0
-
 
 class AcousticSimulator:
     """
@@ -34,7 +32,7 @@ class AcousticSimulator:
         room_center: np.ndarray,
         model_vertices: np.ndarray,
         max_order: int = 3,
-        n_rays: int = 10000,
+        n_rays: Optional[int] = None,
         energy_absorption: float = 0.2,
         scattering: float = 0.1,
     ) -> Optional[str]:
@@ -47,7 +45,7 @@ class AcousticSimulator:
             room_center: Center of the room in world coordinates
             model_vertices: Vertices of the 3D model
             max_order: Maximum order for image source model
-            n_rays: Number of rays for ray tracing
+            n_rays: Number of rays for ray tracing. If None, scales with room volume
             energy_absorption: Material energy absorption coefficient
             scattering: Material scattering coefficient
 
@@ -64,7 +62,7 @@ class AcousticSimulator:
         print(f"{'='*60}")
         print(f"Sound sources: {len(scene_manager.sound_sources)}")
         print(f"Listeners: {len(scene_manager.listeners)}")
-        print(f"Max order: {max_order}, Rays: {n_rays}")
+        print(f"Max order: {max_order}, Rays: {n_rays if n_rays is not None else 'auto'}")
         print(f"Energy absorption: {energy_absorption}, Scattering: {scattering}")
 
         # Create output directory with timestamp
@@ -81,28 +79,22 @@ class AcousticSimulator:
         # Create material
         material = pra.Material(energy_absorption=energy_absorption, scattering=scattering)
 
+        # Scale down to realistic room size (multiply by the reciprocal everywhere)
+        inv_scale = 1.0 / SIZE_REDUCTION_FACTOR
+
         # Build walls list from renderer's triangle data
         print("\nBuilding room geometry...")
-        walls = []
-        for wall_info in walls_from_render:
-            for tri_idx in wall_info['triangles']:
-                triangle_verts = model_vertices[tri_idx * 3 : tri_idx * 3 + 3]
-
-                if triangle_verts.shape[0] < 3:
-                    continue
-
-                # Scale down to realistic room size
-                pra_vertices = triangle_verts.T / SIZE_REDUCTION_FACTOR
-
-                walls.append(
-                    pra.wall_factory(
-                        pra_vertices,
-                        material.energy_absorption["coeffs"],
-                        material.scattering["coeffs"],
-                    )
-                )
-
-        print(f"Created {len(walls)} wall triangles")
+        polygons, n_triangles, _, n_degenerate = build_wall_polygons(
+            walls_from_render, model_vertices, inv_scale
+        )
+        if n_degenerate:
+            print(f"Skipped {n_degenerate} degenerate (zero-area) triangles")
+        ea = material.energy_absorption["coeffs"]
+        sc = material.scattering["coeffs"]
+        wall_factory = pra.wall_factory
+        walls = [wall_factory(corners, ea, sc) for corners in polygons]
+
+        print(f"Created {len(walls)} walls from {n_triangles} triangles")
 
         # For each sound source, run a simulation
         for source_idx, sound_source in enumerate(scene_manager.sound_sources):
@@ -113,41 +105,42 @@ class AcousticSimulator:
             print(f"  Position: {sound_source.position}")
 
             # Load source audio
-            if not os.path.exists(sound_source.audio_file):
-                print(f"  ERROR: Audio file not found: {sound_source.audio_file}")
-                continue
-
             try:
-                fs, signal = wavfile.read(sound_source.audio_file)
+                fs, raw = wavfile.read(sound_source.audio_file)
+
+                # Normalize to float32 [-1, 1] and apply volume with a single scale,
+                # chosen from the file's sample format before any downmix
+                if raw.dtype == np.int16:
+                    scale = sound_source.volume / 32768.0
+                elif raw.dtype == np.int32:
+                    scale = sound_source.volume / 2147483648.0
+                else:
+                    scale = sound_source.volume
+                scale = np.float32(scale)
 
                 # Convert to mono if stereo
-                if len(signal.shape) > 1:
-                    signal = signal.mean(axis=1)
-
-                # Normalize to float32 [-1, 1]
-                if signal.dtype == np.int16:
-                    signal = signal.astype(np.float32) / 32768.0
-                elif signal.dtype == np.int32:
-                    signal = signal.astype(np.float32) / 2147483648.0
+                if raw.ndim > 1:
+                    signal = raw.mean(axis=1, dtype=np.float32)
+                    signal *= scale
                 else:
-                    signal = signal.astype(np.float32)
-
-                # Apply volume
-                signal = signal * sound_source.volume
+                    signal = np.multiply(raw, scale, dtype=np.float32)
 
                 print(f"  Loaded audio: {signal.shape[0]} samples, {fs} Hz")
 
+            except FileNotFoundError:
+                print(f"  ERROR: Audio file not found: {sound_source.audio_file}")
+                continue
             except Exception as e:
                 print(f"  ERROR loading audio: {e}")
                 continue
 
             # Scale source position
-            source_pos_scaled = sound_source.position / SIZE_REDUCTION_FACTOR
+            source_pos_scaled = sound_source.position * inv_scale
 
             # Prepare microphone array from all listeners
             mic_positions = []
             for listener in scene_manager.listeners:
-                mic_pos_scaled = listener.position / SIZE_REDUCTION_FACTOR
+                mic_pos_scaled = listener.position * inv_scale
                 mic_positions.append(mic_pos_scaled)
 
             # Convert to column vectors for pyroomacoustics (shape: 3, n_mics)
@@ -171,7 +164,9 @@ class AcousticSimulator:
             room.add_microphone_array(mic_array)
 
             # Set ray tracing parameters
-            room.set_ray_tracing(n_rays=n_rays)
+            room.set_ray_tracing(
+                n_rays=n_rays if n_rays is not None else adaptive_n_rays(room.volume)
+            )
 
             print(f"  Room volume: {room.volume:.2f} m³")
 
@@ -202,7 +197,7 @@ class AcousticSimulator:
                     output_path = os.path.join(output_dir, output_filename)
 
                     # Write output audio
-                    output_signal_int16 = np.int16(output_signal * 32767)
+                    output_signal_int16 = to_pcm16(output_signal)
                     wavfile.write(output_path, fs, output_signal_int16)
                     print(f"    Saved: {output_filename}")
 
@@ -6,7 +6,7 @@ Provides components for building interactive 3D applications with PyGame and Ope
 """
 
 # Import core constants
-from .constants import Colors
+from .constants import Colors, Layout
 
 # Import base components
 from .base_components import (
@@ -55,6 +55,7 @@ from .application import MainApplication
 __all__ = [
     # Constants
     'Colors',
+    'Layout',
     
     # Base Components
     'GUIComponent',
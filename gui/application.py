@@ -1,35 +1,68 @@
 """
 Main application class for the 3D Architecture GUI
 """
+import ctypes
+import os
+import sys
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 import pygame
-from typing import List
+import numpy as np
+from typing import List, Optional
 from OpenGL.GL import *
 from OpenGL.GLU import *
 
-from .constants import Colors
+from .constants import Colors, Layout
 from .base_components import GUIComponent, TextButton, ImageButton
 from .menu_components import MenuBar
+from .input_components import DropdownMenu
 from .panel_components import LibraryPanel, PropertyPanel, AssetsPanel
 
+# tkinter is only needed for file dialogs; imported on first use
+_tkinter = None
+
+
+def _import_tkinter():
+    """Import tkinter and its file dialogs once, on first use"""
+    global _tkinter
+    if _tkinter is None:
+        import tkinter
+        from tkinter import filedialog
+        _tkinter = (tkinter, filedialog)
+    return _tkinter
+
 
 class MainApplication:
     """Main application class that demonstrates all GUI components"""
     
-    def __init__(self, width: int = 1200, height: int = 800):
+    # Posted by the worker thread when a background load or simulation finishes,
+    # so the idle loop can block on events without polling
+    WORK_DONE_EVENT = pygame.USEREVENT
+    
+    def __init__(self, width: int = 1200, height: int = 800, vsync: bool = False,
+                 target_fps: Optional[int] = 60):
         self.width = width
         self.height = height
+        # Frame rate the main loop paces itself to; None runs unthrottled
+        self.target_fps = target_fps
+        # Waiting for vblank in flip() caps the frame rate; off by default
+        self.vsync = vsync
         
         # Set up OpenGL context
         pygame.display.gl_set_attribute(pygame.GL_DOUBLEBUFFER, 1)
         pygame.display.gl_set_attribute(pygame.GL_DEPTH_SIZE, 24)
         
-        self.screen = pygame.display.set_mode((width, height), pygame.OPENGL | pygame.DOUBLEBUF)
+        self.screen = pygame.display.set_mode((width, height), pygame.OPENGL | pygame.DOUBLEBUF,
+                                              vsync=int(vsync))
         pygame.display.set_caption("PyRoomStudio")
         
         # Basic OpenGL setup - will be configured properly by Render3 class
         # Don't set up OpenGL state here to avoid conflicts
         
-        self.clock = pygame.time.Clock()
+        # Background clear color as normalized RGBA, computed once
+        self._bg_rgba = tuple(c / 255.0 for c in Colors.WHITE) + (1.0,)
+        
         self.running = True
         
         # Initialize 3D renderer
@@ -40,63 +73,115 @@ class MainApplication:
         # Sound source file for acoustic simulation
         self.sound_source_file = None  # Will use default if None
         
+        # Hidden Tk root for file dialogs (created on first use, Tk init is slow)
+        self._tk_root = None
+        
         # Initialize GUI components
         self.init_gui()
+        
+        # Offscreen surface the 2D GUI is drawn into, reused across frames
+        self._gui_surface = pygame.Surface((self.width, self.height), pygame.SRCALPHA)
+        # The GUI surface is only redrawn when something that affects it changed
+        self._ui_dirty = True
+        # Region needing a redraw when only part of the GUI changed (mouse hover)
+        self._ui_dirty_rect: Optional[pygame.Rect] = None
+        self._gui_mouse_pos = None
+        self._synced_colors_version = None
+        # Which GL state setup_2d_rendering left behind: None, "2d" (kept across
+        # frames while there is no 3D scene) or "overlay" (pushed over the 3D scene)
+        self._gl_mode = None
+        # Column-major glOrtho(0, width, height, 0, -1, 1), built once for glLoadMatrixf
+        self._ortho_matrix = np.array([
+            [2.0 / self.width, 0, 0, -1],
+            [0, -2.0 / self.height, 0, 1],
+            [0, 0, -1, 0],
+            [0, 0, 0, 1],
+        ], dtype=np.float32).flatten(order='F')
+        # Placeholder viewport as ((size, loading file), surface), and its font
+        self._placeholder_cache = None
+        self._placeholder_font = None
+        # Flattened tooltip components, see _get_tooltip_components()
+        self._tooltip_components = None
+        self._tooltip_key = None
+        # GL texture holding the GUI surface, allocated once and updated in place
+        self._gui_texture = self._create_gui_texture(self.width, self.height)
+        self._gui_texture_size = (self.width, self.height)
+        # Pixel unpack buffer the GUI surface is staged in before the texture upload
+        self._gui_pbo = glGenBuffers(1)
+        # Static vertex buffer with the full-window quad the GUI texture is drawn on
+        self._gui_quad_vbo = glGenBuffers(1)
+        self._gui_quad_size = None
+        # The surface's raw bytes can be uploaded directly when they are laid out
+        # as BGRA (ARGB masks on a little-endian machine); otherwise convert first
+        self._gui_raw_bgra = (
+            sys.byteorder == 'little'
+            and self._gui_surface.get_masks() == (0xFF0000, 0xFF00, 0xFF, 0xFF000000)
+        )
+        
+        # Event type -> handler; anything else goes straight to the GUI components
+        self._event_handlers = {
+            pygame.QUIT: self._on_quit,
+            pygame.MOUSEWHEEL: self._on_mouse_wheel,
+            pygame.MOUSEBUTTONDOWN: self._on_mouse_event,
+            pygame.MOUSEBUTTONUP: self._on_mouse_event,
+            pygame.MOUSEMOTION: self._on_mouse_event,
+            pygame.KEYDOWN: self._on_key_down,
+            self.WORK_DONE_EVENT: self._on_work_done,
+        }
+        
+        # Only queue events something handles; exposes still wake the loop for a redraw
+        pygame.event.set_blocked(None)
+        pygame.event.set_allowed(list(self._event_handlers) + [pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED])
     
     def init_3d_renderer(self):
         """Initialize the 3D renderer - starts empty"""
         # Define viewport area (where 3D content will be rendered)
-        self.viewport_rect = pygame.Rect(200, 90, self.width - 400, self.height - 220)
+        self.viewport_rect = pygame.Rect(
+            Layout.VIEWPORT_SIDE_MARGIN, Layout.PANEL_Y,
+            self.width - 2 * Layout.VIEWPORT_SIDE_MARGIN,
+            self.height - Layout.PANEL_Y - Layout.VIEWPORT_BOTTOM_MARGIN
+        )
+        # Viewport edges as plain ints for the per-event hit test (the window is not resizable)
+        self._viewport_bounds = (self.viewport_rect.left, self.viewport_rect.top,
+                                 self.viewport_rect.right, self.viewport_rect.bottom)
         
         # Start with no 3D model loaded
         self.renderer = None
         print("3D viewport initialized - no model loaded")
+        
+        # Model loading runs on a worker thread and acoustic simulation on a daemon
+        # thread (see _run_daemon); update() polls the pending futures and finishes
+        # the work on the main (OpenGL) thread
+        self._worker = ThreadPoolExecutor(max_workers=1)
+        self._loading_file = None
+        self._pending_load: Optional[Future] = None
+        self._pending_simulation: Optional[Future] = None
     
     def load_stl_file(self, filepath: str):
-        """Load an STL file into the 3D renderer"""
+        """Start loading an STL file into the 3D renderer (finished in update())"""
         try:
             # Clear any existing renderer and assets first
             print("Clearing previous renderer and assets...")
             
-            # Clear OpenGL state if we have an existing renderer
-            if self.renderer:
-                print("Previous renderer found, clearing OpenGL state...")
-                try:
-                    glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
-                    
-                    # Reset matrices
-                    glMatrixMode(GL_PROJECTION)
-                    glLoadIdentity()
-                    glMatrixMode(GL_MODELVIEW)
-                    glLoadIdentity()
-                except Exception as gl_error:
-                    print(f"OpenGL cleanup error (ignoring): {gl_error}")
-            else:
-                print("No previous renderer found")
-            
-            self.renderer = None
+            # The next draw() clears the frame and sets up 2D state; only the old
+            # model's buffers and texture need freeing
+            self._release_renderer()
+            self._ui_dirty = True
             
             # Clear assets panel
-            for component in self.components:
-                if isinstance(component, AssetsPanel):
-                    component.clear_surfaces()
-                    break
+            self._assets_panel.clear_surfaces()
+            self._invalidate_tooltip_components()
             
-            # Import Render class and create new renderer
-            from render import Render
             print(f"Loading new 3D model: {filepath}")
             print(f"Viewport rect: {self.viewport_rect}")
             print(f"Window height: {self.height}")
             
-            self.renderer = Render(filepath, self.viewport_rect, self.height)
-            print(f"Successfully created renderer for: {filepath}")
-            print(f"Renderer model has {len(self.renderer.model.vectors)} triangles")
-            
-            # Connect renderer to PropertyPanel for scale control
-            self.connect_renderer_to_property_panel()
-            
-            # Extract surface information and populate assets panel
-            self.populate_assets_from_renderer(filepath)
+            # Parse the model and analyse its surfaces off the main thread; the
+            # OpenGL part is finished in update() once the worker is done
+            self._cancel_pending_load()
+            self._loading_file = filepath
+            self._pending_load = self._worker.submit(self._load_renderer_worker, filepath)
+            self._pending_load.add_done_callback(self._notify_work_done)
             
             return True
         except Exception as e:
@@ -106,24 +191,70 @@ class MainApplication:
             self.renderer = None
             return False
     
+    def _release_renderer(self):
+        """Drop the current renderer, freeing its OpenGL buffers and texture"""
+        if self.renderer is not None:
+            self.renderer.release_gl()
+        self.renderer = None
+    
+    def _load_renderer_worker(self, filepath: str):
+        """Build a renderer without touching OpenGL (runs on the worker thread)"""
+        try:
+            from render import Render
+            return Render(filepath, self.viewport_rect, self.height, defer_gl=True)
+        except Exception as e:
+            print(f"Error loading 3D model {filepath}: {e}")
+            import traceback
+            traceback.print_exc()
+            return None
+    
+    def _cancel_pending_load(self):
+        """Forget any model still loading; a load that already started is ignored when done"""
+        if self._pending_load is not None:
+            self._pending_load.cancel()
+        self._pending_load = None
+        self._loading_file = None
+    
+    def _finish_pending_load(self):
+        """Finish a background model load on the main (OpenGL) thread once it is ready"""
+        if self._pending_load is None or not self._pending_load.done():
+            return
+        
+        filepath = self._loading_file
+        renderer = self._pending_load.result()
+        self._pending_load = None
+        self._loading_file = None
+        self._ui_dirty = True
+        if renderer is None:
+            return
+        
+        try:
+            renderer.init_gl()
+            self._gl_mode = None  # init_gl replaced the projection and enable state
+        except Exception as e:
+            print(f"Error loading 3D model {filepath}: {e}")
+            import traceback
+            traceback.print_exc()
+            return
+        
+        self.renderer = renderer
+        print(f"Successfully created renderer for: {filepath}")
+        print(f"Renderer model has {len(self.renderer.model.vectors)} triangles")
+        
+        # Connect renderer to PropertyPanel for scale control
+        self.connect_renderer_to_property_panel()
+        
+        # Extract surface information and populate assets panel
+        self.populate_assets_from_renderer(filepath)
+    
     def connect_renderer_to_property_panel(self):
         """Connect the renderer to the property panel for scale control"""
         if not self.renderer:
             return
         
-        # Find the property panel
-        property_panel = None
-        for component in self.components:
-            if isinstance(component, PropertyPanel):
-                property_panel = component
-                break
-        
-        if property_panel:
-            # Set the renderer reference in the property panel
-            property_panel.set_renderer(self.renderer)
-            print(f"Connected renderer to property panel (scale: {self.renderer.model_scale_factor:.2f}x)")
-        else:
-            print("Warning: Property panel not found")
+        # Set the renderer reference in the property panel
+        self._property_panel.set_renderer(self.renderer)
+        print(f"Connected renderer to property panel (scale: {self.renderer.model_scale_factor:.2f}x)")
     
     def populate_assets_from_renderer(self, filepath: str):
         """Extract surface information from the renderer and populate the assets panel"""
@@ -138,14 +269,12 @@ class MainApplication:
             # Get surface information from the renderer
             surfaces = []
             
+            display_colors = self.renderer.surface_display_colors()
             for i, surface_color in enumerate(self.renderer.surface_colors):
                 print(f"Surface {i}: {surface_color}")
                 
-                # Convert from float (0-1) to int (0-255) for display
-                if all(isinstance(c, float) for c in surface_color):
-                    display_color = tuple(int(c * 255) for c in surface_color[:3])  # Take only RGB, ignore alpha if present
-                else:
-                    display_color = tuple(surface_color[:3])  # Take only RGB
+                # Colors converted from float (0-1) to int (0-255) for display
+                display_color = tuple(int(c) for c in display_colors[i])
                 
                 surface_name = f"Surface {i+1}"
                 surfaces.append((surface_name, display_color, i))
@@ -153,19 +282,12 @@ class MainApplication:
             
             print(f"Total surfaces to add: {len(surfaces)}")
             
-            # Find the assets panel and populate it
-            assets_panel = None
-            for component in self.components:
-                if isinstance(component, AssetsPanel):
-                    assets_panel = component
-                    break
-            
-            if assets_panel:
-                print("Found assets panel, adding surfaces...")
-                assets_panel.add_stl_surfaces(filepath, surfaces)
-                print("Surfaces added to assets panel")
-            else:
-                print("ERROR: Assets panel not found!")
+            # Populate the assets panel
+            print("Adding surfaces to assets panel...")
+            self._assets_panel.add_stl_surfaces(filepath, surfaces)
+            self._invalidate_tooltip_components()
+            self._synced_colors_version = self.renderer.colors_version
+            print("Surfaces added to assets panel")
                     
         except Exception as e:
             print(f"Error populating assets panel: {e}")
@@ -175,15 +297,12 @@ class MainApplication:
     def open_stl_file_dialog(self):
         """Open a file dialog to select an STL file"""
         try:
-            import tkinter as tk
-            from tkinter import filedialog
-            
-            # Create a temporary root window (hidden)
-            root = tk.Tk()
-            root.withdraw()  # Hide the root window
+            _, filedialog = _import_tkinter()
+            root = self._get_tk_root()
             
             # Open file dialog
             filepath = filedialog.askopenfilename(
+                parent=root,
                 title="Open STL File",
                 filetypes=[
                     ("STL files", "*.stl"),
@@ -191,8 +310,8 @@ class MainApplication:
                 ]
             )
             
-            # Clean up the temporary window
-            root.destroy()
+            # Let Tk finish tearing down the dialog window
+            root.update_idletasks()
             
             if filepath:
                 return self.load_stl_file(filepath)
@@ -205,12 +324,20 @@ class MainApplication:
             print(f"Error opening file dialog: {e}")
             return False
     
+    def _get_tk_root(self):
+        """Hidden Tk root shared by all file dialogs, created on first use"""
+        if self._tk_root is None:
+            tk, _ = _import_tkinter()
+            self._tk_root = tk.Tk()
+            self._tk_root.withdraw()  # Hide the root window
+        return self._tk_root
+    
     def init_gui(self):
         """Initialize all GUI components"""
         self.components: List[GUIComponent] = []
         
         # Menu bar at the very top
-        self.menu_bar = MenuBar(0, 0, self.width, 25)
+        self.menu_bar = MenuBar(0, 0, self.width, Layout.MENU_HEIGHT)
         
         # Add Settings menu
         settings_menu = [
@@ -249,12 +376,12 @@ class MainApplication:
         
         self.components.append(self.menu_bar)
         
-        # Top toolbar buttons (moved down to accommodate menu bar)
-        toolbar_y = 30  # Moved down from 10
-        button_width = 60
-        button_height = 50
-        button_spacing = 5
-        start_x = 50
+        # Top toolbar buttons (below the menu bar)
+        toolbar_y = Layout.TOOLBAR_Y
+        button_width = Layout.TOOLBAR_BUTTON_WIDTH
+        button_height = Layout.TOOLBAR_BUTTON_HEIGHT
+        button_spacing = Layout.TOOLBAR_BUTTON_SPACING
+        start_x = Layout.TOOLBAR_START_X
         
         # Create toolbar buttons using the asset images
         toolbar_buttons = [
@@ -273,23 +400,25 @@ class MainApplication:
             self.components.append(button)
         
         # Left panel - Library (using new LibraryPanel)
-        panel_y = 90  # Moved down from 80
-        library_panel = LibraryPanel(10, panel_y, 180, 500)
+        panel_y = Layout.PANEL_Y
+        library_panel = LibraryPanel(Layout.LIBRARY_X, panel_y, Layout.LIBRARY_WIDTH, Layout.LIBRARY_HEIGHT)
         self.components.append(library_panel)
+        self._library_panel = library_panel
         
         # Right panels - Property and Assets (split into two)
-        right_panel_x = self.width - 200
+        right_panel_x = self.width - Layout.RIGHT_PANEL_MARGIN
         
         # Property panel (top half) - needs more height for all elements
-        property_height = 320  # Increased to fit all elements including toggles
-        property_panel = PropertyPanel(right_panel_x, panel_y, 190, property_height)
+        property_height = Layout.PROPERTY_HEIGHT
+        property_panel = PropertyPanel(right_panel_x, panel_y, Layout.RIGHT_PANEL_WIDTH, property_height)
         self.components.append(property_panel)
+        self._property_panel = property_panel
         
         # Assets panel (bottom half) - expanded downwards
-        assets_y = panel_y + property_height + 20  # More spacing between panels
-        assets_height = 280  # Expanded height for more surface visibility
-        assets_panel = AssetsPanel(right_panel_x, assets_y, 190, assets_height)
+        assets_y = panel_y + property_height + Layout.PANEL_SPACING
+        assets_panel = AssetsPanel(right_panel_x, assets_y, Layout.RIGHT_PANEL_WIDTH, Layout.ASSETS_HEIGHT)
         self.components.append(assets_panel)
+        self._assets_panel = assets_panel
         
         # Bottom toolbar
         bottom_buttons = [
@@ -299,41 +428,53 @@ class MainApplication:
             ("Render", self.on_render, None, True)  # Enabled
         ]
         
-        button_width = 100
-        total_width = len(bottom_buttons) * button_width + (len(bottom_buttons) - 1) * 10
+        button_width = Layout.BOTTOM_BUTTON_WIDTH
+        button_spacing = Layout.BOTTOM_BUTTON_SPACING
+        total_width = len(bottom_buttons) * button_width + (len(bottom_buttons) - 1) * button_spacing
         start_x = (self.width - total_width) // 2
+        bottom_y = self.height - Layout.BOTTOM_BAR_OFFSET
         
         for i, (text, callback, tooltip, enabled) in enumerate(bottom_buttons):
-            x = start_x + i * (button_width + 10)
-            button = TextButton(x, self.height - 40, button_width, 30, text, callback=callback, tooltip=tooltip)
+            x = start_x + i * (button_width + button_spacing)
+            button = TextButton(x, bottom_y, button_width, Layout.BOTTOM_BUTTON_HEIGHT, text,
+                                callback=callback, tooltip=tooltip)
             button.enabled = enabled
             self.components.append(button)
+        
+        # Split the drawing work once: menus and the property panel draw their base
+        # with the other components and their dropdowns in a later pass on top
+        self._base_drawables = []
+        self._dropdown_drawables = []
+        for component in self.components:
+            if isinstance(component, (MenuBar, PropertyPanel)):
+                self._base_drawables.append((component.rect, component.draw_base))
+                self._dropdown_drawables.append(component.draw_dropdowns)
+            else:
+                self._base_drawables.append((component.rect, component.draw))
     
     # Menu callback methods
     def on_preferences(self): print("Preferences")
-    def on_display_settings(self): print("Display Settings")
+    def on_display_settings(self):
+        # VSync is fixed when the GL window is created; pass vsync= to MainApplication to change it
+        print(f"Display Settings (VSync: {'on' if self.vsync else 'off'})")
     def on_audio_settings(self): print("Audio Settings")
     def on_keyboard_shortcuts(self): print("Keyboard Shortcuts")
     
     def on_new_project(self): 
         print("New Project")
-        # Clear the current 3D model
-        self.renderer = None
+        # Clear the current 3D model, and drop any model still loading
+        self._release_renderer()
+        self._cancel_pending_load()
+        self._ui_dirty = True
         
         # Clear the assets panel
-        for component in self.components:
-            if isinstance(component, AssetsPanel):
-                component.clear_surfaces()
-                break
+        self._assets_panel.clear_surfaces()
+        self._invalidate_tooltip_components()
         
         print("Cleared 3D model and assets")
     
     def on_open_project(self): 
-        print("Opening STL file...")
-        if self.open_stl_file_dialog():
-            print("STL file loaded successfully")
-        else:
-            print("No file selected or failed to load")
+        self._prompt_open_stl()
     def on_save_project(self): print("Save Project")
     def on_save_as(self): print("Save As...")
     def on_import(self): print("Import...")
@@ -365,24 +506,25 @@ class MainApplication:
     
     def on_import_room(self):
         """Import a 3D room model (same as File -> Open Project)"""
+        self._prompt_open_stl()
+    
+    def _prompt_open_stl(self):
+        """Ask for an STL file and start loading it"""
         print("Opening STL file...")
         if self.open_stl_file_dialog():
-            print("STL file loaded successfully")
+            print("STL file loading...")
         else:
             print("No file selected or failed to load")
     
     def on_import_sound(self):
         """Open a file dialog to select a sound source for acoustic simulation"""
         try:
-            import tkinter as tk
-            from tkinter import filedialog
-            
-            # Create a temporary root window (hidden)
-            root = tk.Tk()
-            root.withdraw()  # Hide the root window
+            _, filedialog = _import_tkinter()
+            root = self._get_tk_root()
             
             # Open file dialog for audio files
             filepath = filedialog.askopenfilename(
+                parent=root,
                 title="Select Sound Source File",
                 filetypes=[
                     ("Audio files", "*.wav *.mp3 *.flac *.ogg"),
@@ -392,8 +534,8 @@ class MainApplication:
                 initialdir="sounds/sources"
             )
             
-            # Clean up the temporary window
-            root.destroy()
+            # Let Tk finish tearing down the dialog window
+            root.update_idletasks()
             
             if filepath:
                 self.sound_source_file = filepath
@@ -427,6 +569,10 @@ class MainApplication:
             print("Use File → Open Project to load a model.")
             return
         
+        if self._pending_simulation is not None:
+            print("A simulation is already running, please wait for it to finish.")
+            return
+        
         try:
             # Update window title to show simulation in progress
             pygame.display.set_caption("PyRoomStudio - Simulating...")
@@ -457,82 +603,190 @@ class MainApplication:
             else:
                 print("Using default sound source")
             print("(This may take a few moments...)")
-            output_file = acoustic.simulate(walls, room_center, model_vertices, scale_factor, self.sound_source_file)
-            
-            # Restore window title (keep sound name if loaded)
-            if self.sound_source_file:
-                sound_name = self.sound_source_file.split('/')[-1].split('\\')[-1]
-                pygame.display.set_caption(f"PyRoomStudio - Sound: {sound_name}")
-            else:
-                pygame.display.set_caption("PyRoomStudio")
-            
-            # Print success message
-            print("\n" + "=" * 60)
-            print("SIMULATION COMPLETE!")
-            print("=" * 60)
-            print(f"Output saved to: {output_file}")
-            print("You can now play this file to hear the simulated acoustics.")
-            print("=" * 60)
+            # Simulate on a daemon thread so the window keeps responding and closing
+            # it doesn't wait for the simulation; the result is picked up by
+            # _finish_pending_simulation()
+            self._pending_simulation = self._run_daemon(
+                acoustic.simulate, walls, room_center, model_vertices, scale_factor, self.sound_source_file
+            )
+            self._pending_simulation.add_done_callback(self._notify_work_done)
             
-        except FileNotFoundError as e:
+        except Exception as e:
+            self._report_simulation_error(e)
+    
+    def _run_daemon(self, fn, *args) -> Future:
+        """Run fn(*args) on a daemon thread and return a Future for its result.
+
+        Threads of the worker pool are joined when the interpreter exits, which would
+        keep a closed window's process alive until a long simulation finishes.
+        """
+        future = Future()
+        
+        def run():
+            if not future.set_running_or_notify_cancel():
+                return
+            try:
+                future.set_result(fn(*args))
+            except BaseException as e:
+                future.set_exception(e)
+        
+        threading.Thread(target=run, name="simulation", daemon=True).start()
+        return future
+    
+    def _finish_pending_simulation(self):
+        """Report the result of a background simulation once it is done"""
+        if self._pending_simulation is None or not self._pending_simulation.done():
+            return
+        future, self._pending_simulation = self._pending_simulation, None
+        
+        error = future.exception()
+        if error is not None:
+            self._report_simulation_error(error)
+            return
+        output_file = future.result()
+        
+        # Restore window title (keep sound name if loaded)
+        self._restore_caption()
+        
+        # Print success message
+        print("\n" + "=" * 60)
+        print("SIMULATION COMPLETE!")
+        print("=" * 60)
+        print(f"Output saved to: {output_file}")
+        print("You can now play this file to hear the simulated acoustics.")
+        print("=" * 60)
+    
+    def _report_simulation_error(self, e: BaseException):
+        """Print a failed simulation's error and restore the window title"""
+        if isinstance(e, FileNotFoundError):
             print(f"\nERROR: File not found - {e}")
             print("Make sure the sound source file exists in the sounds/sources/ directory.")
-            pygame.display.set_caption("PyRoomStudio")
-            
-        except ValueError as e:
+        elif isinstance(e, ValueError):
             print(f"\nERROR: Invalid input - {e}")
             print("The 3D model geometry may be invalid for acoustic simulation.")
-            pygame.display.set_caption("PyRoomStudio")
-            
-        except RuntimeError as e:
+        elif isinstance(e, RuntimeError):
             print(f"\nERROR: Simulation error - {e}")
             print("The acoustic simulation encountered an error.")
-            pygame.display.set_caption("PyRoomStudio")
-            
-        except Exception as e:
+        else:
             print(f"\nERROR: Unexpected error - {e}")
             import traceback
-            traceback.print_exc()
-            pygame.display.set_caption("PyRoomStudio")
+            traceback.print_exception(type(e), e, e.__traceback__)
             print("Please check the error message above for details.")
+        pygame.display.set_caption("PyRoomStudio")
     
-    def handle_events(self):
-        """Handle all pygame events"""
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                self.running = False
-            
-            # Check if event is in 3D viewport area or is a mouse wheel event
-            viewport_event = False
-            if self.viewport_rect and self.renderer:
-                # Mouse wheel events don't have 'pos' attribute, so handle them separately
-                if event.type == pygame.MOUSEWHEEL:
-                    mouse_pos = pygame.mouse.get_pos()
-                    if self.viewport_rect.collidepoint(mouse_pos):
-                        viewport_event = True
-                        self.renderer.check_keybinds(event)
-                # Handle other mouse events with position
-                elif hasattr(event, 'pos'):
-                    if self.viewport_rect.collidepoint(event.pos):
-                        viewport_event = True
-                        # Route event to 3D renderer
-                        self.renderer.check_keybinds(event)
-            
-            # Let GUI components handle events (if not consumed by 3D viewport)
-            if not viewport_event:
-                for component in self.components:
-                    if component.handle_event(event):
-                        break  # Stop processing if event was consumed
-            
-            # Handle keyboard events for 3D renderer (not position-dependent)
-            if event.type == pygame.KEYDOWN and self.renderer:
+    def _restore_caption(self):
+        """Reset the window title, keeping the loaded sound's name if there is one"""
+        if self.sound_source_file:
+            sound_name = self.sound_source_file.split('/')[-1].split('\\')[-1]
+            pygame.display.set_caption(f"PyRoomStudio - Sound: {sound_name}")
+        else:
+            pygame.display.set_caption("PyRoomStudio")
+    
+    def handle_events(self, first_event: Optional[pygame.event.Event] = None) -> bool:
+        """Handle all pygame events. Returns True if there were any."""
+        events = pygame.event.get()
+        if first_event is not None:
+            events.insert(0, first_event)
+        last = len(events) - 1
+        handlers = self._event_handlers
+        for i, event in enumerate(events):
+            # Consecutive motion events are superseded by the newest one; both the
+            # renderer and the components only use the latest absolute position
+            if event.type == pygame.MOUSEMOTION and i < last and events[i + 1].type == pygame.MOUSEMOTION:
+                continue
+            handlers.get(event.type, self._dispatch_to_components)(event)
+        return bool(events)
+    
+    def _on_quit(self, event: pygame.event.Event):
+        self.running = False
+        self._dispatch_to_components(event)
+    
+    def _on_mouse_wheel(self, event: pygame.event.Event):
+        # Mouse wheel events don't have 'pos' attribute, so use the cursor position
+        if self.renderer:
+            x, y = pygame.mouse.get_pos()
+            left, top, right, bottom = self._viewport_bounds
+            if left <= x < right and top <= y < bottom:
                 self.renderer.check_keybinds(event)
+                return
+        self._dispatch_to_components(event)
+    
+    def _on_mouse_event(self, event: pygame.event.Event):
+        # Route events in the 3D viewport area to the renderer. A drag that started in
+        # the viewport keeps going to the renderer until the button is released, even
+        # outside it, so the release is never lost to the GUI components.
+        renderer = self.renderer
+        if renderer:
+            x, y = event.pos
+            left, top, right, bottom = self._viewport_bounds
+            if renderer.mouse_down or (left <= x < right and top <= y < bottom):
+                renderer.check_keybinds(event)
+                return
+        self._dispatch_to_components(event)
+    
+    def _on_work_done(self, event: pygame.event.Event):
+        # Nothing to do here: update() picks up the finished work right after
+        pass
+    
+    def _notify_work_done(self, future: Future):
+        """Wake the main loop from the worker thread once a future completes"""
+        try:
+            pygame.event.post(pygame.event.Event(self.WORK_DONE_EVENT))
+        except pygame.error:
+            pass  # Display already shut down
+    
+    def _on_key_down(self, event: pygame.event.Event):
+        self._dispatch_to_components(event)
+        # Handle keyboard events for 3D renderer (not position-dependent)
+        if self.renderer:
+            self.renderer.check_keybinds(event)
+    
+    def _dispatch_to_components(self, event: pygame.event.Event):
+        """Let GUI components handle an event not consumed by the 3D viewport"""
+        # Plain mouse motion only changes hover state inside the components under the
+        # previous and current cursor position, unless something is drawn on top
+        partial = (event.type == pygame.MOUSEMOTION and not self._ui_dirty
+                   and not self._overlay_visible())
+        
+        consumed = False
+        for component in self.components:
+            if component.handle_event(event):
+                consumed = True
+                break  # Stop processing if event was consumed
+        
+        # A consumed motion is a drag (slider knob, gallery scrollbar), which changes
+        # its component wherever the cursor is, so it needs a full redraw
+        if partial and not consumed and not self._overlay_visible():
+            previous_pos, self._gui_mouse_pos = self._gui_mouse_pos, event.pos
+            for component in self.components:
+                rect = component.rect
+                if rect.collidepoint(event.pos) or (previous_pos and rect.collidepoint(previous_pos)):
+                    self._mark_rect_dirty(rect)
+        else:
+            if event.type == pygame.MOUSEMOTION:
+                self._gui_mouse_pos = event.pos
+            self._ui_dirty = True
+    
+    def _mark_rect_dirty(self, rect: pygame.Rect):
+        """Add rect to the region of the GUI surface redrawn next frame"""
+        if self._ui_dirty_rect is None:
+            self._ui_dirty_rect = rect.copy()
+        else:
+            self._ui_dirty_rect.union_ip(rect)
     
     def update(self, dt: float):
         """Update all components"""
         for component in self.components:
             component.update(dt)
         
+        # Apply the 3D view input gathered this frame
+        if self.renderer:
+            self.renderer.update()
+        
+        # Pick up a model load or simulation that finished in the background
+        self._finish_pending_load()
+        self._finish_pending_simulation()
+        
         # Update surface colors in assets panel if 3D model is loaded
         self.sync_surface_colors()
     
@@ -542,25 +796,14 @@ class MainApplication:
             return
         
         try:
-            # Find the assets panel
-            assets_panel = None
-            for component in self.components:
-                if isinstance(component, AssetsPanel):
-                    assets_panel = component
-                    break
-            
-            if not assets_panel:
+            # The renderer bumps colors_version whenever it changes a surface color
+            if self.renderer.colors_version == self._synced_colors_version:
                 return
+            self._synced_colors_version = self.renderer.colors_version
             
-            # Update each surface color
-            for i, surface_color in enumerate(self.renderer.surface_colors):
-                # Convert from float (0-1) to int (0-255) for display
-                if all(isinstance(c, float) for c in surface_color):
-                    display_color = tuple(int(c * 255) for c in surface_color[:3])
-                else:
-                    display_color = tuple(surface_color[:3])
-                
-                assets_panel.update_surface_color(i, display_color)
+            # Push the colors in one batch; only surfaces whose color differs are touched
+            if self._assets_panel.update_surface_colors(self.renderer.surface_display_colors()):
+                self._ui_dirty = True
                 
         except Exception as e:
             # Silently handle errors to avoid spam in console
@@ -569,11 +812,12 @@ class MainApplication:
     def draw(self):
         """Draw everything with mixed OpenGL 3D and 2D GUI"""
         # Clear the screen
-        glClearColor(1.0, 1.0, 1.0, 1.0)  # White background
+        glClearColor(*self._bg_rgba)  # White background
         glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
         
         # Render 3D scene first (if renderer is available)
         if self.renderer:
+            self.renderer.needs_redraw = False
             try:
                 self.renderer.draw_scene()
             except Exception as e:
@@ -584,9 +828,30 @@ class MainApplication:
         # Switch to 2D rendering for GUI
         self.setup_2d_rendering()
         
-        # Create a pygame surface for 2D GUI rendering
-        gui_surface = pygame.Surface((self.width, self.height), pygame.SRCALPHA)
-        gui_surface.fill((0, 0, 0, 0))  # Transparent background
+        # Reuse the pygame surface for 2D GUI rendering; only redraw what is dirty
+        gui_surface = self._gui_surface
+        if self._ui_dirty:
+            self._ui_dirty = False
+            self._ui_dirty_rect = None
+            self.draw_gui(gui_surface)
+            self.upload_gui_texture(gui_surface)
+        elif self._ui_dirty_rect is not None:
+            region = self._ui_dirty_rect.clip(gui_surface.get_rect())
+            self._ui_dirty_rect = None
+            if region.width and region.height:
+                gui_surface.set_clip(region)
+                self.draw_gui(gui_surface, region)
+                gui_surface.set_clip(None)
+                self.upload_gui_texture(gui_surface, region)
+        
+        # Blit the GUI surface to OpenGL
+        self.blit_surface_to_opengl(gui_surface)
+        
+        pygame.display.flip()
+    
+    def draw_gui(self, gui_surface: pygame.Surface, region: Optional[pygame.Rect] = None):
+        """Redraw the 2D GUI into gui_surface, or only the components touching region"""
+        gui_surface.fill((0, 0, 0, 0), region)  # Transparent background
         
         # Draw placeholder if no 3D model is loaded
         if not self.renderer:
@@ -594,77 +859,96 @@ class MainApplication:
             gui_surface.blit(placeholder_surface, (self.viewport_rect.x, self.viewport_rect.y))
         
         # Draw all GUI components on the surface (without any dropdowns)
-        for component in self.components:
-            if isinstance(component, MenuBar):
-                component.draw_base(gui_surface)
-            elif isinstance(component, PropertyPanel):
-                component.draw_base(gui_surface)
-            else:
-                component.draw(gui_surface)
+        for rect, draw in self._base_drawables:
+            if region is None or rect.colliderect(region):
+                draw(gui_surface)
         
         # Draw all dropdowns last (on top of everything)
-        for component in self.components:
-            if isinstance(component, MenuBar):
-                component.draw_dropdowns(gui_surface)
-            elif isinstance(component, PropertyPanel):
-                component.draw_dropdowns(gui_surface)
+        for draw_dropdowns in self._dropdown_drawables:
+            draw_dropdowns(gui_surface)
         
         # Draw all tooltips last (on top of everything including dropdowns)
         self.draw_all_tooltips(gui_surface)
-        
-        # Blit the GUI surface to OpenGL
-        self.blit_surface_to_opengl(gui_surface)
-        
-        pygame.display.flip()
     
     def draw_all_tooltips(self, surface: pygame.Surface):
         """Draw tooltips for all components, ensuring they render on top of everything"""
-        for component in self.components:
-            self._draw_component_tooltips(component, surface)
+        for item in self._get_tooltip_components():
+            item.draw_tooltip(surface)
+    
+    def _get_tooltip_components(self) -> List[GUIComponent]:
+        """Flat list of components that have a tooltip, rebuilt only when the tree changes"""
+        # The visible library galleries and the open menu's items change with these
+        key = (self._library_panel.active_tab, self.menu_bar.active_menu_index)
+        if self._tooltip_components is None or key != self._tooltip_key:
+            self._tooltip_key = key
+            self._tooltip_components = [
+                item
+                for component in self.components
+                for item in self._iter_tooltip_components(component)
+                if getattr(item, 'tooltip', None)
+            ]
+        return self._tooltip_components
     
-    def _draw_component_tooltips(self, component, surface: pygame.Surface):
-        """Recursively draw tooltips for a component and its children"""
-        # Draw tooltip for this component
+    def _invalidate_tooltip_components(self):
+        """Drop the flattened tooltip list after components were added or removed"""
+        self._tooltip_components = None
+    
+    def _iter_tooltip_components(self, component):
+        """Recursively yield a component and every child that may show a tooltip"""
         if hasattr(component, 'draw_tooltip'):
-            component.draw_tooltip(surface)
+            yield component
         
-        # Draw tooltips for child components
+        # Child components
         if hasattr(component, 'components'):
             for child in component.components:
-                self._draw_component_tooltips(child, surface)
+                yield from self._iter_tooltip_components(child)
         
         # Special handling for panels with galleries
         if isinstance(component, LibraryPanel):
             galleries = component.sound_galleries if component.active_tab == "SOUND" else component.material_galleries
             for gallery in galleries:
-                self._draw_component_tooltips(gallery, surface)
+                yield from self._iter_tooltip_components(gallery)
         
         if isinstance(component, AssetsPanel):
             for gallery in component.galleries:
-                self._draw_component_tooltips(gallery, surface)
+                yield from self._iter_tooltip_components(gallery)
         
         # Handle gallery image items
         if hasattr(component, 'image_items'):
             for item in component.image_items:
-                self._draw_component_tooltips(item, surface)
+                yield from self._iter_tooltip_components(item)
         
         # Handle gallery surface items
         if hasattr(component, 'surface_items'):
             for item in component.surface_items:
-                self._draw_component_tooltips(item, surface)
+                yield from self._iter_tooltip_components(item)
         
         # Handle radio button groups
         if hasattr(component, 'radio_buttons'):
             for radio in component.radio_buttons:
-                self._draw_component_tooltips(radio, surface)
+                yield from self._iter_tooltip_components(radio)
         
         # Handle menu bar dropdown items
         if isinstance(component, MenuBar) and hasattr(component, 'dropdown_items'):
             for item in component.dropdown_items:
-                self._draw_component_tooltips(item, surface)
+                yield from self._iter_tooltip_components(item)
+    
+    def _overlay_visible(self) -> bool:
+        """Whether an open menu, expanded dropdown or tooltip is drawn over the GUI"""
+        if self.menu_bar.active_menu_index != -1:
+            return True
+        if any(isinstance(child, DropdownMenu) and child.expanded
+               for child in self._property_panel.components):
+            return True
+        return any(item.tooltip_visible() for item in self._get_tooltip_components())
     
     def draw_placeholder_viewport(self):
         """Draw a placeholder when 3D renderer is not available"""
+        # The placeholder only depends on the viewport size and what is loading
+        key = (self.viewport_rect.size, self._loading_file)
+        if self._placeholder_cache is not None and self._placeholder_cache[0] == key:
+            return self._placeholder_cache[1]
+        
         # Use pygame surface for better text rendering
         placeholder_surface = pygame.Surface((self.viewport_rect.width, self.viewport_rect.height))
         placeholder_surface.fill(Colors.LIGHT_GRAY)
@@ -674,13 +958,22 @@ class MainApplication:
                         pygame.Rect(0, 0, self.viewport_rect.width, self.viewport_rect.height), 2)
         
         # Draw message text
-        font = pygame.font.Font(None, 24)
-        text_lines = [
-            "No 3D Model Loaded",
-            "",
-            "File → Open Project",
-            "to load an STL file"
-        ]
+        if self._placeholder_font is None:
+            self._placeholder_font = pygame.font.Font(None, 24)
+        font = self._placeholder_font
+        if self._loading_file:
+            text_lines = [
+                "Loading 3D Model...",
+                "",
+                os.path.basename(self._loading_file),
+            ]
+        else:
+            text_lines = [
+                "No 3D Model Loaded",
+                "",
+                "File → Open Project",
+                "to load an STL file"
+            ]
         
         total_text_height = len(text_lines) * 30
         start_y = (self.viewport_rect.height - total_text_height) // 2
@@ -693,62 +986,196 @@ class MainApplication:
                 text_rect.y = start_y + i * 30
                 placeholder_surface.blit(text_surface, text_rect)
         
+        # Match the GUI surface's pixel format so the blit onto it is a plain copy
+        placeholder_surface = placeholder_surface.convert(self._gui_surface)
+        self._placeholder_cache = (key, placeholder_surface)
         return placeholder_surface
     
     def setup_2d_rendering(self):
         """Set up OpenGL for 2D GUI rendering"""
+        if self.renderer is None:
+            # Nothing 3D to preserve: keep the 2D state from the previous frame
+            if self._gl_mode != "2d":
+                glMatrixMode(GL_PROJECTION)
+                glLoadMatrixf(self._ortho_matrix)
+                glMatrixMode(GL_MODELVIEW)
+                glLoadIdentity()
+                glDisable(GL_DEPTH_TEST)
+                glEnable(GL_BLEND)
+                glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
+                self._gl_mode = "2d"
+            return
+        
+        # Draw over the 3D scene, saving its matrices and enable/texture/client-array
+        # state for the next frame; blit_surface_to_opengl restores them in one go
+        glPushAttrib(GL_ENABLE_BIT | GL_TEXTURE_BIT | GL_DEPTH_BUFFER_BIT)
+        glPushClientAttrib(GL_CLIENT_VERTEX_ARRAY_BIT)
         glMatrixMode(GL_PROJECTION)
         glPushMatrix()
-        glLoadIdentity()
-        glOrtho(0, self.width, self.height, 0, -1, 1)
+        glLoadMatrixf(self._ortho_matrix)
         glMatrixMode(GL_MODELVIEW)
         glPushMatrix()
         glLoadIdentity()
         glDisable(GL_DEPTH_TEST)
-        glEnable(GL_BLEND)
-        glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
+        if self._gl_mode is None:
+            # The renderer leaves blending on with this function; set it once
+            glEnable(GL_BLEND)
+            glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
+        self._gl_mode = "overlay"
     
-    def blit_surface_to_opengl(self, surface):
-        """Convert pygame surface to OpenGL texture and render it"""
-        # Convert surface to string data
-        w, h = surface.get_size()
-        raw = pygame.image.tostring(surface, 'RGBA')
-        
-        # Create and bind texture
-        texture_id = glGenTextures(1)
-        glBindTexture(GL_TEXTURE_2D, texture_id)
-        glTexImage2D(GL_TEXTURE_2D, 0, GL_RGBA, w, h, 0, GL_RGBA, GL_UNSIGNED_BYTE, raw)
+    def _create_gui_texture(self, w: int, h: int):
+        """Allocate the texture storage the GUI surface is uploaded into"""
+        texture = glGenTextures(1)
+        glBindTexture(GL_TEXTURE_2D, texture)
+        if bool(glTexStorage2D):
+            # Immutable storage (GL 4.2 / ARB_texture_storage) spares the driver
+            # from re-validating the texture on every update
+            glTexStorage2D(GL_TEXTURE_2D, 1, GL_RGBA8, w, h)
+        else:
+            glTexImage2D(GL_TEXTURE_2D, 0, GL_RGBA, w, h, 0, GL_RGBA, GL_UNSIGNED_BYTE, None)
         glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
         glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
+        return texture
+    
+    def upload_gui_texture(self, surface, region: Optional[pygame.Rect] = None):
+        """Copy the pygame surface (or only region of it) into the persistent GUI texture"""
+        w, h = surface.get_size()
+        if self._gui_raw_bgra:
+            # Upload straight from the surface memory: a zero-copy numpy view of the
+            # pixel buffer, without swizzling it to RGBA first. The view keeps the
+            # surface locked, so it must not outlive this call.
+            raw, pixel_format = np.frombuffer(surface.get_view('1'), dtype=np.uint8), GL_BGRA
+            row_length = surface.get_pitch() // 4
+        else:
+            raw, pixel_format = pygame.image.tostring(surface, 'RGBA'), GL_RGBA
+            row_length = w
+        
+        # Storage is only reallocated if the surface size changed
+        if (w, h) != self._gui_texture_size:
+            glDeleteTextures([self._gui_texture])
+            self._gui_texture = self._create_gui_texture(w, h)
+            self._gui_texture_size = (w, h)
+            region = None
+        
+        glBindTexture(GL_TEXTURE_2D, self._gui_texture)
+        if region is None:
+            region = pygame.Rect(0, 0, w, h)
+        
+        # Tell GL the buffer's row stride so it reads rows (and a sub-rectangle)
+        # straight out of the surface memory
+        if row_length != region.width:
+            glPixelStorei(GL_UNPACK_ROW_LENGTH, row_length)
+        if region.x or region.y:
+            glPixelStorei(GL_UNPACK_SKIP_PIXELS, region.x)
+            glPixelStorei(GL_UNPACK_SKIP_ROWS, region.y)
+        if self._gui_raw_bgra:
+            # Stage the dirty rows in a pixel buffer so the texture transfer itself
+            # runs asynchronously; the buffer mirrors the surface layout, so the
+            # unpack skip/stride settings address it exactly like the surface
+            pitch = row_length * 4
+            start, end = region.y * pitch, region.bottom * pitch
+            glBindBuffer(GL_PIXEL_UNPACK_BUFFER, self._gui_pbo)
+            # Orphan the previous contents so a transfer still in flight never stalls us
+            glBufferData(GL_PIXEL_UNPACK_BUFFER, pitch * h, None, GL_STREAM_DRAW)
+            glBufferSubData(GL_PIXEL_UNPACK_BUFFER, start, end - start, raw[start:end])
+            glTexSubImage2D(GL_TEXTURE_2D, 0, region.x, region.y, region.width, region.height,
+                            pixel_format, GL_UNSIGNED_BYTE, None)
+            glBindBuffer(GL_PIXEL_UNPACK_BUFFER, 0)
+        else:
+            glTexSubImage2D(GL_TEXTURE_2D, 0, region.x, region.y, region.width, region.height,
+                            pixel_format, GL_UNSIGNED_BYTE, raw)
+        if row_length != region.width:
+            glPixelStorei(GL_UNPACK_ROW_LENGTH, 0)
+        if region.x or region.y:
+            glPixelStorei(GL_UNPACK_SKIP_PIXELS, 0)
+            glPixelStorei(GL_UNPACK_SKIP_ROWS, 0)
+    
+    def blit_surface_to_opengl(self, surface):
+        """Render the GUI texture (uploaded from surface) over the whole window"""
+        w, h = surface.get_size()
+        glBindTexture(GL_TEXTURE_2D, self._gui_texture)
+        glBindBuffer(GL_ARRAY_BUFFER, self._gui_quad_vbo)
+        if (w, h) != self._gui_quad_size:
+            # Interleaved (x, y, u, v) for a triangle strip covering the surface
+            quad = np.array([
+                0, 0, 0, 0,
+                w, 0, 1, 0,
+                0, h, 0, 1,
+                w, h, 1, 1,
+            ], dtype=np.float32)
+            glBufferData(GL_ARRAY_BUFFER, quad.nbytes, quad, GL_STATIC_DRAW)
+            self._gui_quad_size = (w, h)
         
         # Enable texturing and render
         glEnable(GL_TEXTURE_2D)
         glColor4f(1, 1, 1, 1)
-        glBegin(GL_QUADS)
-        glTexCoord2f(0, 0); glVertex2f(0, 0)
-        glTexCoord2f(1, 0); glVertex2f(w, 0)
-        glTexCoord2f(1, 1); glVertex2f(w, h)
-        glTexCoord2f(0, 1); glVertex2f(0, h)
-        glEnd()
-        glDisable(GL_TEXTURE_2D)
-        
-        # Clean up
-        glDeleteTextures([texture_id])
-        
-        # Restore matrices
-        glPopMatrix()
-        glMatrixMode(GL_PROJECTION)
-        glPopMatrix()
-        glMatrixMode(GL_MODELVIEW)
-        glEnable(GL_DEPTH_TEST)
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glEnableClientState(GL_TEXTURE_COORD_ARRAY)
+        glVertexPointer(2, GL_FLOAT, 16, None)
+        glTexCoordPointer(2, GL_FLOAT, 16, ctypes.c_void_p(8))
+        glDrawArrays(GL_TRIANGLE_STRIP, 0, 4)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        
+        if self._gl_mode == "overlay":
+            # Restore the 3D scene's matrices and the attributes pushed in setup_2d_rendering
+            glPopMatrix()
+            glMatrixMode(GL_PROJECTION)
+            glPopMatrix()
+            glMatrixMode(GL_MODELVIEW)
+            glPopClientAttrib()
+            glPopAttrib()
+        else:
+            glDisableClientState(GL_TEXTURE_COORD_ARRAY)
+            glDisableClientState(GL_VERTEX_ARRAY)
+            glDisable(GL_TEXTURE_2D)
+    
+    def _pace_frame(self, frame_start: float):
+        """Wait out the rest of the frame started at frame_start to hold target_fps"""
+        if not self.target_fps:
+            return
+        deadline = frame_start + 1.0 / self.target_fps
+        # Sleep coarsely, then spin the last millisecond for an accurate frame time
+        remaining = deadline - time.perf_counter() - 0.001
+        if remaining > 0:
+            time.sleep(remaining)
+        while time.perf_counter() < deadline:
+            pass
     
     def run(self):
         """Main game loop"""
+        redraw = True
+        last_frame = time.perf_counter()
         while self.running:
-            dt = self.clock.tick(60) / 1000.0  # Delta time in seconds
+            frame_start = time.perf_counter()
+            dt = frame_start - last_frame  # Delta time in seconds
+            last_frame = frame_start
             
-            self.handle_events()
+            # Nothing changed last frame: sleep until input (or finished background
+            # work) arrives instead of redrawing; drawn frames are paced by _pace_frame
+            first_event = None
+            if not redraw:
+                first_event = pygame.event.wait()
+                if first_event.type == pygame.NOEVENT:
+                    first_event = None
+            
+            self.handle_events(first_event)
             self.update(dt)
-            self.draw()
+            
+            # Only draw a frame when the GUI or the 3D view actually changed
+            redraw = (self._ui_dirty or self._ui_dirty_rect is not None
+                      or (self.renderer is not None and self.renderer.needs_redraw))
+            if redraw:
+                self.draw()
+                self._pace_frame(frame_start)
         
+        # Drop queued loads. A load already parsing still finishes before the process
+        # exits (the pool's threads are joined at exit); a running simulation is on a
+        # daemon thread and is abandoned
+        self._worker.shutdown(wait=False, cancel_futures=True)
+        if self._tk_root is not None:
+            self._tk_root.destroy()
+            self._tk_root = None
+        self._release_renderer()
+        glDeleteTextures([self._gui_texture])
+        glDeleteBuffers(2, [self._gui_quad_vbo, self._gui_pbo])
         pygame.quit()
@@ -2,10 +2,85 @@
 Base GUI components: GUIComponent, TextButton, ImageButton, ToggleButton
 """
 import pygame
-from typing import Optional, Callable
+from functools import lru_cache
+from typing import Optional, Callable, Dict, Set, Tuple
 from .constants import Colors
 
 
+# Loaded and scaled images, keyed by (path, size), shared by every component
+_IMAGE_CACHE: Dict[Tuple[str, Tuple[int, int]], pygame.Surface] = {}
+
+# Placeholders for images that can't be loaded, keyed by (size, color)
+_PLACEHOLDER_CACHE: Dict[Tuple[Tuple[int, int], Tuple[int, int, int]], pygame.Surface] = {}
+# Paths that failed to load, so they are only tried (and reported) once
+_MISSING_IMAGES: Set[str] = set()
+
+
+def _to_display_format(image: pygame.Surface, alpha: bool) -> pygame.Surface:
+    """Convert a surface to the display's pixel format, if a display mode is set"""
+    try:
+        return image.convert_alpha() if alpha else image.convert()
+    except pygame.error:
+        return image  # No display mode set yet; keep the surface's own pixel format
+
+
+def _placeholder(size: Tuple[int, int], color: Tuple[int, int, int]) -> pygame.Surface:
+    """Return the shared solid placeholder surface for size and color"""
+    key = (size, color)
+    image = _PLACEHOLDER_CACHE.get(key)
+    if image is None:
+        image = pygame.Surface(size)
+        image.fill(color)
+        image = _PLACEHOLDER_CACHE[key] = _to_display_format(image, alpha=False)
+    return image
+
+
+def load_image(image_path: str, size: Tuple[int, int],
+               placeholder_color: Tuple[int, int, int] = Colors.GRAY) -> pygame.Surface:
+    """
+    Load an image scaled to size, decoding each (path, size) only once.
+    
+    The result is converted to the display's pixel format when a display is
+    available. Callers share the returned surface and must not draw on it.
+    If the image can't be loaded, a shared placeholder filled with
+    placeholder_color is returned, and the path is not tried again.
+    """
+    key = (image_path, size)
+    image = _IMAGE_CACHE.get(key)
+    if image is not None:
+        return image
+    if image_path in _MISSING_IMAGES:
+        return _placeholder(size, placeholder_color)
+    
+    try:
+        image = pygame.transform.scale(pygame.image.load(image_path), size)
+    except (pygame.error, FileNotFoundError) as e:
+        # Use a placeholder if image can't be loaded (pygame 2 raises FileNotFoundError for missing files)
+        print(f"Could not load image {image_path}: {e}")
+        _MISSING_IMAGES.add(image_path)
+        return _placeholder(size, placeholder_color)
+    
+    image = _IMAGE_CACHE[key] = _to_display_format(image, alpha=True)
+    return image
+
+
+@lru_cache(maxsize=512)
+def _render_text_cached(font: pygame.font.Font, text: str,
+                        color: Tuple[int, ...]) -> pygame.Surface:
+    return font.render(text, True, color)
+
+
+def render_text(font: pygame.font.Font, text: str, color) -> pygame.Surface:
+    """
+    Render antialiased text, rasterizing each (font, text, color) only once.
+    
+    Labels are redrawn far more often than they change, so the most recently
+    used renderings are kept. Callers share the returned surface and must not
+    draw on it.
+    """
+    return _render_text_cached(font, text, tuple(color))
+
+
 class GUIComponent:
     """Base class for all GUI components"""
     
@@ -45,16 +120,20 @@ class GUIComponent:
                     
         return False
     
+    def tooltip_visible(self) -> bool:
+        """Whether the tooltip is currently shown (hovering over a disabled component)"""
+        return bool(self.visible and self.hover and self.tooltip and not self.enabled)
+    
     def draw_tooltip(self, surface: pygame.Surface):
         """Draw tooltip if hovering over disabled component"""
-        if not self.visible or not self.hover or not self.tooltip or self.enabled:
+        if not self.tooltip_visible():
             return
         
         # Get mouse position
         mouse_pos = pygame.mouse.get_pos()
         
         # Render tooltip text
-        text_surface = self.tooltip_font.render(self.tooltip, True, Colors.BLACK)
+        text_surface = render_text(self.tooltip_font, self.tooltip, Colors.BLACK)
         text_rect = text_surface.get_rect()
         
         # Create tooltip background with padding
@@ -139,7 +218,7 @@ class TextButton(GUIComponent):
         pygame.draw.rect(surface, border_color, self.rect, 2)
         
         # Draw text
-        text_surface = self.font.render(self.text, True, text_color)
+        text_surface = render_text(self.font, self.text, text_color)
         text_rect = text_surface.get_rect(center=self.rect.center)
         surface.blit(text_surface, text_rect)
 
@@ -153,13 +232,7 @@ class ImageButton(GUIComponent):
         super().__init__(x, y, width, height, tooltip)
         self.callback = callback
         
-        try:
-            self.image = pygame.image.load(image_path)
-            self.image = pygame.transform.scale(self.image, (width - 4, height - 4))
-        except pygame.error:
-            # Create a placeholder if image can't be loaded
-            self.image = pygame.Surface((width - 4, height - 4))
-            self.image.fill(Colors.GRAY)
+        self.image = load_image(image_path, (width - 4, height - 4), Colors.GRAY)
         
         self.border_color = Colors.DARK_GRAY
         self.hover_color = Colors.LIGHT_BLUE
@@ -239,7 +312,7 @@ class ToggleButton(GUIComponent):
         
         # Draw text
         if self.text:
-            text_surface = self.font.render(self.text, True, self.text_color)
+            text_surface = render_text(self.font, self.text, self.text_color)
             text_rect = text_surface.get_rect(center=self.rect.center)
             surface.blit(text_surface, text_rect)
         
@@ -15,3 +15,36 @@ class Colors:
     RED = (220, 20, 60)
     ORANGE = (255, 140, 0)
     YELLOW = (255, 255, 0)
+
+
+class Layout:
+    """Fixed window layout of the main application, in pixels"""
+    MENU_HEIGHT = 25
+    
+    # Top toolbar
+    TOOLBAR_Y = 30
+    TOOLBAR_START_X = 50
+    TOOLBAR_BUTTON_WIDTH = 60
+    TOOLBAR_BUTTON_HEIGHT = 50
+    TOOLBAR_BUTTON_SPACING = 5
+    
+    # Side panels
+    PANEL_Y = 90
+    PANEL_SPACING = 20
+    LIBRARY_X = 10
+    LIBRARY_WIDTH = 180
+    LIBRARY_HEIGHT = 500
+    RIGHT_PANEL_MARGIN = 200  # right panels start this far from the right edge
+    RIGHT_PANEL_WIDTH = 190
+    PROPERTY_HEIGHT = 320
+    ASSETS_HEIGHT = 280
+    
+    # Bottom toolbar
+    BOTTOM_BUTTON_WIDTH = 100
+    BOTTOM_BUTTON_HEIGHT = 30
+    BOTTOM_BUTTON_SPACING = 10
+    BOTTOM_BAR_OFFSET = 40  # bottom buttons sit this far above the window bottom
+    
+    # 3D viewport, between the side panels and above the bottom toolbar
+    VIEWPORT_SIDE_MARGIN = 200
+    VIEWPORT_BOTTOM_MARGIN = 130
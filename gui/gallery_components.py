@@ -4,7 +4,7 @@ Gallery GUI components: ImageItem, SurfaceItem, ImageGallery, SurfaceGallery
 import pygame
 from typing import List, Tuple, Optional, Callable
 from .constants import Colors
-from .base_components import GUIComponent
+from .base_components import GUIComponent, render_text, load_image
 
 
 class ImageItem(GUIComponent):
@@ -12,23 +12,19 @@ class ImageItem(GUIComponent):
     
     def __init__(self, x: int, y: int, width: int, height: int, 
                  image_path: str, label: str, callback: Optional[Callable] = None,
-                 tooltip: Optional[str] = None):
+                 tooltip: Optional[str] = None, image: Optional[pygame.Surface] = None):
         super().__init__(x, y, width, height, tooltip)
         self.label = label
         self.callback = callback
         self.font = pygame.font.Font(None, 12)
         
-        # Load image or create placeholder
-        try:
-            self.image = pygame.image.load(image_path)
-            # Scale image to fit within the item, leaving space for label
+        if image is not None:
+            # Pre-scaled image supplied by the gallery (a view into its atlas)
+            self.image = image
+        else:
+            # Load image (scaled to fit within the item, leaving space for label) or placeholder
             image_height = height - 20  # Leave 20px for label
-            self.image = pygame.transform.scale(self.image, (width - 4, image_height - 4))
-        except pygame.error:
-            # Create placeholder
-            image_height = height - 20
-            self.image = pygame.Surface((width - 4, image_height - 4))
-            self.image.fill(Colors.LIGHT_GRAY)
+            self.image = load_image(image_path, (width - 4, image_height - 4), Colors.LIGHT_GRAY)
         
         # Colors
         self.bg_color = Colors.WHITE
@@ -72,7 +68,7 @@ class ImageItem(GUIComponent):
             surface.blit(grayed_image, image_rect)
         
         # Label
-        text_surface = self.font.render(self.label, True, text_color)
+        text_surface = render_text(self.font, self.label, text_color)
         text_rect = text_surface.get_rect(center=(self.rect.centerx, self.rect.bottom - 10))
         surface.blit(text_surface, text_rect)
 
@@ -128,7 +124,7 @@ class SurfaceItem(GUIComponent):
         pygame.draw.rect(surface, self.border_color, color_rect, 1)
         
         # Draw surface name
-        text_surface = self.font.render(self.surface_name, True, self.text_color)
+        text_surface = render_text(self.font, self.surface_name, self.text_color)
         text_rect = text_surface.get_rect(center=(self.rect.centerx, self.rect.bottom - 10))
         surface.blit(text_surface, text_rect)
 
@@ -168,10 +164,26 @@ class ImageGallery(GUIComponent):
         self.expanded_height = self.rect.height
         self.collapsed_height = self.title_height
     
+    def _build_image_atlas(self, items: List[Tuple[str, str]], image_size: Tuple[int, int]) -> List[pygame.Surface]:
+        """Pack every item image into one atlas surface and return a view for each item"""
+        image_w, image_h = image_size
+        self._atlas = pygame.Surface((image_w * max(1, len(items)), image_h), pygame.SRCALPHA)
+        
+        views = []
+        for i, (image_path, _) in enumerate(items):
+            area = pygame.Rect(i * image_w, 0, image_w, image_h)
+            self._atlas.blit(load_image(image_path, image_size, Colors.LIGHT_GRAY), area)
+            views.append(self._atlas.subsurface(area))
+        return views
+    
     def _create_image_items(self, items: List[Tuple[str, str]], tooltip: Optional[str] = None):
         """Create image items from list of (image_path, label) tuples"""
         self.image_items.clear()
         
+        # Same image size ImageItem would compute (label space and border removed)
+        item_w, item_h = self.item_width - 5, self.item_height - 5
+        images = self._build_image_atlas(items, (item_w - 4, item_h - 20 - 4))
+        
         for i, (image_path, label) in enumerate(items):
             row = i // self.items_per_row
             col = i % self.items_per_row
@@ -179,8 +191,8 @@ class ImageGallery(GUIComponent):
             item_x = self.rect.x + 5 + col * self.item_width
             item_y = self.rect.y + self.title_height + 5 + row * self.item_height
             
-            item = ImageItem(item_x, item_y, self.item_width - 5, self.item_height - 5,
-                           image_path, label, self.callback, tooltip)
+            item = ImageItem(item_x, item_y, item_w, item_h,
+                           image_path, label, self.callback, tooltip, image=images[i])
             self.image_items.append(item)
     
     def handle_event(self, event: pygame.event.Event) -> bool:
@@ -228,7 +240,7 @@ class ImageGallery(GUIComponent):
         # Draw title text with expand/collapse indicator
         indicator = "+" if self.collapsed else "-"
         title_text = f"{indicator} {self.title}"
-        text_surface = self.font.render(title_text, True, self.title_text_color)
+        text_surface = render_text(self.font, title_text, self.title_text_color)
         text_rect = text_surface.get_rect(midleft=(title_rect.x + 5, title_rect.centery))
         surface.blit(text_surface, text_rect)
         
@@ -303,6 +315,7 @@ class SurfaceGallery(GUIComponent):
     def _create_surface_items(self, surfaces: List[Tuple[str, Tuple[int, int, int], int]]):
         """Create surface items from list of (name, color, index) tuples"""
         self.surface_items.clear()
+        self._items_by_index = {}
         
         content_width = self.rect.width - (self.scrollbar_width if self.needs_scrolling else 0) - 10
         items_per_row = max(1, content_width // self.item_width)
@@ -317,13 +330,13 @@ class SurfaceGallery(GUIComponent):
             item = SurfaceItem(item_x, item_y, self.item_width - 5, self.item_height - 5,
                              surface_name, surface_color, surface_index, self.callback)
             self.surface_items.append(item)
+            self._items_by_index[surface_index] = item
     
     def update_surface_color(self, surface_index: int, new_color: Tuple[int, int, int]):
         """Update the color of a specific surface"""
-        for item in self.surface_items:
-            if item.surface_index == surface_index:
-                item.update_color(new_color)
-                break
+        item = self._items_by_index.get(surface_index)
+        if item is not None:
+            item.update_color(new_color)
     
     def handle_event(self, event: pygame.event.Event) -> bool:
         if not self.visible or not self.enabled:
@@ -444,7 +457,7 @@ class SurfaceGallery(GUIComponent):
         # Draw title text with expand/collapse indicator
         indicator = "+" if self.collapsed else "-"
         title_text = f"{indicator} {self.title}"
-        text_surface = self.font.render(title_text, True, self.title_text_color)
+        text_surface = render_text(self.font, title_text, self.title_text_color)
         text_rect = text_surface.get_rect(midleft=(title_rect.x + 5, title_rect.centery))
         surface.blit(text_surface, text_rect)
         
@@ -4,7 +4,7 @@ Input GUI components: DropdownMenu, Slider, RadioButton, CheckBox
 import pygame
 from typing import List, Optional, Callable
 from .constants import Colors
-from .base_components import GUIComponent
+from .base_components import GUIComponent, render_text
 
 
 class DropdownMenu(GUIComponent):
@@ -85,7 +85,7 @@ class DropdownMenu(GUIComponent):
         # Draw selected text
         if self.options:
             text = self.options[self.selected_index]
-            text_surface = self.font.render(text, True, text_color)
+            text_surface = render_text(self.font, text, text_color)
             text_rect = text_surface.get_rect(midleft=(self.rect.x + 5, self.rect.centery))
             surface.blit(text_surface, text_rect)
         
@@ -117,7 +117,7 @@ class DropdownMenu(GUIComponent):
             pygame.draw.rect(surface, self.border_color, option_rect, 1)
             
             # Draw option text
-            text_surface = self.font.render(option, True, self.text_color)
+            text_surface = render_text(self.font, option, self.text_color)
             text_rect = text_surface.get_rect(midleft=(option_rect.x + 5, option_rect.centery))
             surface.blit(text_surface, text_rect)
 
@@ -256,7 +256,7 @@ class RadioButton(GUIComponent):
             pygame.draw.circle(surface, selected_color, (circle_x, circle_y), self.circle_size // 2 - 4)
         
         # Text
-        text_surface = self.font.render(self.text, True, text_color)
+        text_surface = render_text(self.font, self.text, text_color)
         text_rect = text_surface.get_rect(midleft=(circle_x + self.circle_size, circle_y))
         surface.blit(text_surface, text_rect)
 
@@ -408,6 +408,6 @@ class CheckBox(GUIComponent):
             pygame.draw.lines(surface, checked_color, False, check_points, 2)
         
         # Text
-        text_surface = self.font.render(self.text, True, text_color)
+        text_surface = render_text(self.font, self.text, text_color)
         text_rect = text_surface.get_rect(midleft=(box_x + self.box_size + 8, self.rect.centery))
         surface.blit(text_surface, text_rect)
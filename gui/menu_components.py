@@ -4,7 +4,7 @@ Menu GUI components: MenuItem, MenuButton, MenuBar
 import pygame
 from typing import List, Tuple, Callable, Optional, Union
 from .constants import Colors
-from .base_components import GUIComponent
+from .base_components import GUIComponent, render_text
 
 
 class MenuItem(GUIComponent):
@@ -45,7 +45,7 @@ class MenuItem(GUIComponent):
         pygame.draw.rect(surface, self.border_color, self.rect, 1)
         
         # Text
-        text_surface = self.font.render(self.text, True, text_color)
+        text_surface = render_text(self.font, self.text, text_color)
         text_rect = text_surface.get_rect(midleft=(self.rect.x + 8, self.rect.centery))
         surface.blit(text_surface, text_rect)
 
@@ -208,7 +208,7 @@ class MenuBar(GUIComponent):
             pygame.draw.rect(surface, bg_color, button.rect)
             
             # Draw text
-            text_surface = button.font.render(button.text, True, text_color)
+            text_surface = render_text(button.font, button.text, text_color)
             text_rect = text_surface.get_rect(center=button.rect.center)
             surface.blit(text_surface, text_rect)
     
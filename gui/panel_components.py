@@ -2,10 +2,11 @@
 Panel GUI components: Panel, LibraryPanel, PropertyPanel, AssetsPanel
 """
 import pygame
+import numpy as np
 import os
 from typing import List, Tuple, Optional, Callable
 from .constants import Colors
-from .base_components import GUIComponent, TextButton
+from .base_components import GUIComponent, render_text, TextButton
 from .input_components import DropdownMenu, Slider, RadioButtonGroup, CheckBox
 from .gallery_components import ImageGallery, SurfaceGallery
 
@@ -75,7 +76,7 @@ class Panel(GUIComponent):
             pygame.draw.rect(surface, self.border_color, title_rect, 1)
             
             # Draw title text
-            title_surface = self.font.render(self.title, True, self.title_text_color)
+            title_surface = render_text(self.font, self.title, self.title_text_color)
             title_text_rect = title_surface.get_rect(midleft=(title_rect.x + 5, title_rect.centery))
             surface.blit(title_surface, title_text_rect)
             
@@ -134,10 +135,13 @@ class LibraryPanel(GUIComponent):
         self.sound_galleries: List[ImageGallery] = []
         self.material_galleries: List[ImageGallery] = []
         
+        # Material galleries are only built the first time the MATERIAL tab is shown
+        self._material_galleries_built = False
+        
         self._create_sample_galleries()
     
     def _create_sample_galleries(self):
-        """Create sample galleries with placeholder data"""
+        """Create sample sound galleries with placeholder data"""
         # Sound galleries
         voices_items = [
             ("assets/adult_male.png", "Adult Male"),
@@ -152,6 +156,15 @@ class LibraryPanel(GUIComponent):
         voices_gallery.enabled = False  # Disable individual items
         self.sound_galleries.append(voices_gallery)
         
+        # Initial positioning
+        self._reposition_galleries()
+    
+    def _create_material_galleries(self):
+        """Create sample material galleries with placeholder data, once"""
+        if self._material_galleries_built:
+            return
+        self._material_galleries_built = True
+        
         # Material galleries  
         hvac_items = [
             ("assets/adult_male.png", "Item 1"),
@@ -186,9 +199,6 @@ class LibraryPanel(GUIComponent):
                                     tooltip="Future feature!")
         custom_gallery.enabled = False  # Disable individual items
         self.material_galleries.append(custom_gallery)
-        
-        # Initial positioning
-        self._reposition_galleries()
     
     def _reposition_galleries(self):
         """Reposition galleries to stack towards the top based on their collapsed state"""
@@ -206,6 +216,15 @@ class LibraryPanel(GUIComponent):
             
             current_y += gallery.rect.height + 5
     
+    def set_active_tab(self, tab: str):
+        """Switch to the "SOUND" or "MATERIAL" tab; only the incoming tab's galleries are touched"""
+        if tab == self.active_tab:
+            return
+        self.active_tab = tab
+        if tab == "MATERIAL":
+            self._create_material_galleries()
+        self._reposition_galleries()
+    
     def handle_event(self, event: pygame.event.Event) -> bool:
         if not self.visible or not self.enabled:
             return False
@@ -217,12 +236,10 @@ class LibraryPanel(GUIComponent):
             material_tab_rect = pygame.Rect(self.rect.x + 5 + self.tab_width, tab_y, self.tab_width, self.tab_height)
             
             if sound_tab_rect.collidepoint(event.pos):
-                self.active_tab = "SOUND"
-                self._reposition_galleries()
+                self.set_active_tab("SOUND")
                 return True
             elif material_tab_rect.collidepoint(event.pos):
-                self.active_tab = "MATERIAL"
-                self._reposition_galleries()
+                self.set_active_tab("MATERIAL")
                 return True
         
         # Handle gallery events based on active tab
@@ -258,7 +275,7 @@ class LibraryPanel(GUIComponent):
         pygame.draw.rect(surface, self.border_color, header_rect, 1)
         
         # Draw header text
-        header_text = self.font.render("LIBRARY", True, self.header_text_color)
+        header_text = render_text(self.font, "LIBRARY", self.header_text_color)
         header_text_rect = header_text.get_rect(center=header_rect.center)
         surface.blit(header_text, header_text_rect)
         
@@ -271,7 +288,7 @@ class LibraryPanel(GUIComponent):
         sound_bg = self.tab_active_color if self.active_tab == "SOUND" else self.tab_inactive_color
         pygame.draw.rect(surface, sound_bg, sound_tab_rect)
         pygame.draw.rect(surface, self.border_color, sound_tab_rect, 1)
-        sound_text = self.tab_font.render("SOUND", True, self.tab_text_color)
+        sound_text = render_text(self.tab_font, "SOUND", self.tab_text_color)
         sound_text_rect = sound_text.get_rect(center=sound_tab_rect.center)
         surface.blit(sound_text, sound_text_rect)
         
@@ -279,7 +296,7 @@ class LibraryPanel(GUIComponent):
         material_bg = self.tab_active_color if self.active_tab == "MATERIAL" else self.tab_inactive_color
         pygame.draw.rect(surface, material_bg, material_tab_rect)
         pygame.draw.rect(surface, self.border_color, material_tab_rect, 1)
-        material_text = self.tab_font.render("MATERIAL", True, self.tab_text_color)
+        material_text = render_text(self.tab_font, "MATERIAL", self.tab_text_color)
         material_text_rect = material_text.get_rect(center=material_tab_rect.center)
         surface.blit(material_text, material_text_rect)
         
@@ -318,6 +335,11 @@ class PropertyPanel(GUIComponent):
         # Reference to the renderer (set by application)
         self.renderer = None
         
+        # Scale the labels and renderer were last updated with, and the latest
+        # slider value still waiting to be applied by update()
+        self._applied_scale = None
+        self._pending_scale = None
+        
         # Create GUI elements
         self._create_elements()
     
@@ -383,6 +405,17 @@ class PropertyPanel(GUIComponent):
     
     def on_scale_change(self, value):
         """Handle scale slider changes"""
+        # A fast drag reports several values per frame and only the last one is ever
+        # seen, so defer the work to update() and apply it once per frame
+        self._pending_scale = value
+    
+    def _apply_scale(self, value: float):
+        """Apply a slider scale to the renderer and the scale/size labels"""
+        # Dragging along the slider's height reports the same value again; skip the
+        # renderer update, label rebuild and redraw when nothing actually changed
+        if value == self._applied_scale:
+            return
+        self._applied_scale = value
         self.scale_value_label.text = f"{value:.1f}x"
         
         # Update renderer if available
@@ -413,6 +446,8 @@ class PropertyPanel(GUIComponent):
         if renderer:
             # Update slider to reflect current scale
             self.scale_slider.value = renderer.model_scale_factor
+            self._pending_scale = None
+            self._applied_scale = renderer.model_scale_factor
             self.scale_value_label.text = f"{renderer.model_scale_factor:.1f}x"
             # Update dimension display
             dimensions = renderer.get_real_world_dimensions()
@@ -431,6 +466,10 @@ class PropertyPanel(GUIComponent):
     def update(self, dt: float):
         for component in self.components:
             component.update(dt)
+        
+        if self._pending_scale is not None:
+            value, self._pending_scale = self._pending_scale, None
+            self._apply_scale(value)
     
     def draw(self, surface: pygame.Surface):
         """Draw both the panel and dropdowns"""
@@ -452,7 +491,7 @@ class PropertyPanel(GUIComponent):
         pygame.draw.rect(surface, self.border_color, header_rect, 1)
         
         # Draw header text
-        header_text = self.font.render("PROPERTY", True, self.header_text_color)
+        header_text = render_text(self.font, "PROPERTY", self.header_text_color)
         header_text_rect = header_text.get_rect(center=header_rect.center)
         surface.blit(header_text, header_text_rect)
         
@@ -505,6 +544,8 @@ class AssetsPanel(GUIComponent):
     def _create_galleries(self):
         """Create asset galleries - starts empty"""
         self.galleries = []
+        # Colors last shown for each surface, as an (N, 3) uint8 array
+        self._surface_colors = None
     
     def add_stl_surfaces(self, stl_filename: str, surfaces: List[Tuple[str, Tuple[int, int, int], int]]):
         """Add surfaces from an STL file to the assets panel"""
@@ -512,6 +553,7 @@ class AssetsPanel(GUIComponent):
         
         # Clear existing galleries
         self.galleries.clear()
+        self._surface_colors = None
         print("Cleared existing galleries")
         
         # Extract just the filename without path and extension
@@ -533,6 +575,7 @@ class AssetsPanel(GUIComponent):
             )
             
             self.galleries = [surface_gallery]
+            self._surface_colors = np.array([color for _, color, _ in surfaces], dtype=np.uint8)
             print(f"Created gallery with {len(surface_gallery.surface_items)} surface items")
             
             self._reposition_galleries()
@@ -549,9 +592,24 @@ class AssetsPanel(GUIComponent):
             if isinstance(gallery, SurfaceGallery):
                 gallery.update_surface_color(surface_index, new_color)
     
+    def update_surface_colors(self, colors: np.ndarray) -> bool:
+        """Update all surface colors from an (N, 3) uint8 array, touching only the ones
+        that changed. Returns True if any surface color changed."""
+        previous = self._surface_colors
+        if previous is not None and previous.shape == colors.shape:
+            changed = np.flatnonzero(np.any(previous != colors, axis=1))
+        else:
+            changed = np.arange(len(colors))
+        self._surface_colors = colors.copy()
+        
+        for i in changed.tolist():
+            self.update_surface_color(i, tuple(colors[i].tolist()))
+        return len(changed) > 0
+    
     def clear_surfaces(self):
         """Clear all surface galleries"""
         self.galleries.clear()
+        self._surface_colors = None
     
     def on_surface_select(self, surface_index: int, surface_name: str):
         """Handle surface selection from the assets panel"""
@@ -616,7 +674,7 @@ class AssetsPanel(GUIComponent):
         pygame.draw.rect(surface, self.border_color, header_rect, 1)
         
         # Draw header text
-        header_text = self.font.render("ASSETS", True, self.header_text_color)
+        header_text = render_text(self.font, "ASSETS", self.header_text_color)
         header_text_rect = header_text.get_rect(center=header_rect.center)
         surface.blit(header_text, header_text_rect)
         
@@ -1,30 +1,41 @@
+import ctypes
 import pygame
 from pygame.locals import *
 from OpenGL.GL import *
 from OpenGL.GLU import *
 import numpy as np
 from stl import mesh
-import math
-import sys
-from acoustic import Acoustic
-import collections
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
 import random
 from PIL import Image
 
+# Texture projection plane per dominant normal axis: X -> (Y, Z), Y -> (X, Z), Z -> (X, Y)
+_TEXTURE_PLANES = np.array([[1, 2], [0, 2], [0, 1]])
+
 class Render:
-    def __init__(self, filename, view_rect, window_height):
+    def __init__(self, filename, view_rect, window_height, defer_gl=False):
+        """
+        Load an STL model and prepare it for rendering.
+
+        With defer_gl=True no OpenGL calls are made, so the (slow) model loading
+        and surface analysis can run on a worker thread; init_gl() must then be
+        called on the thread that owns the GL context before drawing.
+        """
         self.view_rect = view_rect
         self.window_height = window_height
         self.width = view_rect.width
         self.height = view_rect.height
-        
-        glEnable(GL_DEPTH_TEST)
-        glEnable(GL_BLEND)  # Enable blending for transparency
-        glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)  # Standard alpha blending
-        glEnable(GL_TEXTURE_2D)  # Enable texturing
-        glClearColor(1.0, 1.0, 1.0, 1.0) # This will be cleared over by the GUI background
+        self.gl_ready = False
+        self.texture_id = None
+        self._model_buffers = None  # Vertex buffers created by init_gl(), see create_model_buffers()
 
         self.model = mesh.Mesh.from_file(filename)
+        # Corner and edge vectors of every triangle, for batched ray picking
+        corners = self.model.vectors.astype(np.float64)
+        self._tri_v0 = np.ascontiguousarray(corners[:, 0])
+        self._tri_edge1 = corners[:, 1] - corners[:, 0]
+        self._tri_edge2 = corners[:, 2] - corners[:, 0]
         self.center, self.size = self.compute_center_and_size()
         
         # Scale factor for model (1.0 = original size)
@@ -35,9 +46,6 @@ class Render:
         # Auto-normalize the model to realistic room size
         self.auto_normalize_scale()
         
-        # Set up projection with dynamic clipping planes based on scaled model size
-        self.update_projection()
-        
         # Note: camera distances are set by auto_normalize_scale via set_scale_factor
         self.camera_heading = 35.0  # degrees
         self.camera_pitch = 35.0    # degrees
@@ -45,29 +53,106 @@ class Render:
         self.last_mouse_pos = None
         self.mouse_down_pos = None  # Track where mouse was pressed
         self.transparent_mode = False  # Track transparency state
+        self._pending_zoom_steps = 0  # Mouse wheel steps not yet applied (+ = zoom in)
+        self._drag_pos = None  # Latest drag position not yet applied to the camera
+        # Set whenever something visible changed; the GUI only redraws the scene when set
+        self.needs_redraw = True
 
         # The following is no longer needed since GUI now controls the main loop
         # self.running = True
 
-        # Load texture
-        self.texture_id = self.load_texture("cat.png")
-
         # Build edge map for feature/boundary edge detection
+        self._mesh_edges = None  # Edge/triangle adjacency, see mesh_edges()
+        self._feature_edge_mask = None
         self.feature_edges = self.compute_feature_edges(angle_threshold_degrees=10)
 
         # Group triangles into surfaces
         self.surfaces = self.group_triangles_into_surfaces()
         self.default_surface_color = [0.6, 0.8, 1.0]
         self.surface_colors = [self.default_surface_color[:] for _ in self.surfaces]
+        # Bumped whenever surface_colors changes, so observers can skip unchanged frames
+        self.colors_version = 0
+        self._colors_u8 = None
+        self._model_vertices = None  # Packed copy of the mesh vertices, see get_model_vertices()
+        self._colors_u8_version = None
         self.surface_materials = [None for _ in self.surfaces]  # None = no texture, True = textured
         # Map triangle index to surface index
         self.triangle_to_surface = {}
         for surf_idx, surf in enumerate(self.surfaces):
             for tri_idx in surf:
                 self.triangle_to_surface[tri_idx] = surf_idx
+        self.compute_surface_bounds()
+
+        # Decode the texture here rather than in init_gl(), so with defer_gl the PNG
+        # decode happens on the worker thread and only the upload is left for GL
+        self._texture_image = self.decode_texture("cat.png")
+
+        if not defer_gl:
+            self.init_gl()
+
+    def init_gl(self):
+        """Set up OpenGL state, projection and textures. Must run on the GL thread."""
+        glEnable(GL_DEPTH_TEST)
+        glEnable(GL_BLEND)  # Enable blending for transparency
+        glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)  # Standard alpha blending
+        glEnable(GL_TEXTURE_2D)  # Enable texturing
+        glClearColor(1.0, 1.0, 1.0, 1.0) # This will be cleared over by the GUI background
+
+        self.gl_ready = True
+
+        # Set up projection with dynamic clipping planes based on scaled model size
+        self.update_projection()
+
+        # Upload the texture decoded in __init__; the pixels are no longer needed after
+        if self._texture_image is not None:
+            self.texture_id = self.upload_texture(self._texture_image, "cat.png")
+            self._texture_image = None
+
+        # The geometry never changes, so it is uploaded once for draw_model()
+        if self._model_buffers is None:
+            self.create_model_buffers()
+
+    def create_model_buffers(self):
+        """Upload the static model geometry into vertex buffers. Must run on the GL thread."""
+        vertex_vbo, texcoord_vbo, color_vbo, edge_vbo, index_vbo = (int(b) for b in glGenBuffers(5))
+        self._model_buffers = (vertex_vbo, texcoord_vbo, color_vbo, edge_vbo, index_vbo)
+
+        glBindBuffer(GL_ARRAY_BUFFER, vertex_vbo)
+        vertices = self.get_model_vertices()
+        glBufferData(GL_ARRAY_BUFFER, vertices.nbytes, vertices, GL_STATIC_DRAW)
+
+        glBindBuffer(GL_ARRAY_BUFFER, texcoord_vbo)
+        texcoords = self.compute_texture_coords()
+        glBufferData(GL_ARRAY_BUFFER, texcoords.nbytes, texcoords, GL_STATIC_DRAW)
+
+        edge_vertices = np.array(list(self.feature_edges), dtype=np.float32).reshape(-1, 3)
+        self._n_edge_vertices = len(edge_vertices)
+        if self._n_edge_vertices:
+            glBindBuffer(GL_ARRAY_BUFFER, edge_vbo)
+            glBufferData(GL_ARRAY_BUFFER, edge_vertices.nbytes, edge_vertices, GL_STATIC_DRAW)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+
+        # Colors and draw order depend on the surfaces' state; uploaded by draw_model()
+        self._draw_state = None
+        self._n_textured_indices = self._n_colored_indices = 0
+
+    def release_gl(self):
+        """Delete the model's vertex buffers and texture. Must run on the GL thread."""
+        if self._model_buffers is not None:
+            glDeleteBuffers(len(self._model_buffers), self._model_buffers)
+            self._model_buffers = None
+        if self.texture_id:
+            glDeleteTextures([self.texture_id])
+            self.texture_id = None
 
     def load_texture(self, filename):
         """Load a texture from file and return the OpenGL texture ID"""
+        image = self.decode_texture(filename)
+        return self.upload_texture(image, filename) if image is not None else None
+
+    def decode_texture(self, filename):
+        """Decode a texture file into an upload-ready RGB image (no OpenGL calls)"""
+        # Only file and decode errors mean "no texture"; anything else is a real bug
         try:
             image = Image.open(filename)
             image = image.transpose(Image.FLIP_TOP_BOTTOM)  # OpenGL expects bottom-left origin
@@ -84,162 +169,150 @@ class Render:
                 new_height = 2 ** (height - 1).bit_length()
                 image = image.resize((new_width, new_height), Image.Resampling.LANCZOS)
                 print(f"Resized texture to {new_width}x{new_height} for better compatibility")
-            
-            image_data = image.tobytes()
-            
-            texture_id = glGenTextures(1)
-            glBindTexture(GL_TEXTURE_2D, texture_id)
-            glTexImage2D(GL_TEXTURE_2D, 0, GL_RGB, image.width, image.height, 0, GL_RGB, GL_UNSIGNED_BYTE, image_data)
-            glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR_MIPMAP_LINEAR)
-            glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
-            glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_S, GL_CLAMP_TO_EDGE)
-            glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_T, GL_CLAMP_TO_EDGE)
-            glGenerateMipmap(GL_TEXTURE_2D)
-            
-            print(f"Successfully loaded texture: {filename} ({image.width}x{image.height})")
-            return texture_id
-        except Exception as e:
+        except FileNotFoundError:
+            print(f"Texture not found: {filename}")
+            return None
+        except OSError as e:
             print(f"Error loading texture {filename}: {e}")
             return None
+        return image
 
-    def get_texture_coords_from_normal(self, vertex, normal, surface_bounds=None):
-        """Calculate texture coordinates based on surface normal direction"""
-        # Normalize the normal vector
-        normal = normal / np.linalg.norm(normal)
-        
-        # Use world coordinates directly for more predictable mapping
-        # This avoids the complex normal-based coordinate system that was causing issues
-        
-        # Get the dominant axis of the normal to determine the mapping plane
-        abs_normal = np.abs(normal)
-        dominant_axis = np.argmax(abs_normal)
-        
-        if dominant_axis == 0:  # Normal mostly in X direction
-            # Map using Y and Z coordinates
-            tex_x = vertex[1]  # Y coordinate
-            tex_y = vertex[2]  # Z coordinate
-        elif dominant_axis == 1:  # Normal mostly in Y direction
-            # Map using X and Z coordinates
-            tex_x = vertex[0]  # X coordinate
-            tex_y = vertex[2]  # Z coordinate
-        else:  # Normal mostly in Z direction (dominant_axis == 2)
-            # Map using X and Y coordinates
-            tex_x = vertex[0]  # X coordinate
-            tex_y = vertex[1]  # Y coordinate
-        
-        # If we have surface bounds, normalize to the surface extent
-        if surface_bounds:
-            min_x, max_x, min_y, max_y = surface_bounds
-            range_x = max_x - min_x
-            range_y = max_y - min_y
-            
-            # Normalize coordinates
-            if range_x > 0:
-                tex_x = (tex_x - min_x) / range_x
-            else:
-                tex_x = 0.5
-            if range_y > 0:
-                tex_y = (tex_y - min_y) / range_y
-            else:
-                tex_y = 0.5
-        else:
-            # Fallback to simple mapping if no bounds provided
-            # Scale and center the coordinates
-            tex_x = tex_x * 0.1 + 0.5  # Scale down and center
-            tex_y = tex_y * 0.1 + 0.5  # Scale down and center
-        
-        # Ensure coordinates are within [0, 1] range
-        tex_x = max(0.0, min(1.0, tex_x))
-        tex_y = max(0.0, min(1.0, tex_y))
-        
-        return [tex_x, tex_y]
+    def upload_texture(self, image, filename):
+        """Upload a decoded texture image and return the OpenGL texture ID"""
+        image_data = image.tobytes()
+        texture_id = glGenTextures(1)
+        glBindTexture(GL_TEXTURE_2D, texture_id)
+        glTexImage2D(GL_TEXTURE_2D, 0, GL_RGB, image.width, image.height, 0, GL_RGB, GL_UNSIGNED_BYTE, image_data)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR_MIPMAP_LINEAR)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_S, GL_CLAMP_TO_EDGE)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_T, GL_CLAMP_TO_EDGE)
+        glGenerateMipmap(GL_TEXTURE_2D)
+        
+        print(f"Successfully loaded texture: {filename} ({image.width}x{image.height})")
+        return texture_id
+
+    def compute_texture_coords(self):
+        """
+        Texture coordinates for every model vertex, as an (n_triangles * 3, 2) array.
+
+        Each triangle is projected onto the axis plane its normal faces most, then
+        normalized to the extent of its surface, which is measured on the plane
+        faced by the surface's first triangle.
+        """
+        triangles = self.model.vectors
+        axes = np.argmax(np.abs(self.model.normals), axis=1)
+        planes = _TEXTURE_PLANES[axes]
+        projected = np.take_along_axis(triangles, planes[:, None, :], axis=2)
+
+        # Surface extents on the plane of each surface's first triangle
+        first_triangles = np.array([next(iter(surf)) for surf in self.surfaces])
+        surface_planes = _TEXTURE_PLANES[axes[first_triangles]][self._triangle_surface]
+        on_surface_plane = np.take_along_axis(triangles, surface_planes[:, None, :], axis=2)
+        order, offsets = self._surface_order, self._surface_offsets
+        low = np.minimum.reduceat(on_surface_plane.min(axis=1)[order], offsets)[self._triangle_surface]
+        high = np.maximum.reduceat(on_surface_plane.max(axis=1)[order], offsets)[self._triangle_surface]
+        extent = (high - low)[:, None, :]
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            texcoords = np.where(extent > 0, (projected - low[:, None, :]) / extent, 0.5)
+        return np.clip(texcoords, 0.0, 1.0).astype(np.float32).reshape(-1, 2)
+
+    def surface_display_colors(self):
+        """Surface colors as 0-255 RGB values, one row per surface (cached per colors_version)"""
+        if self._colors_u8_version != self.colors_version:
+            colors = np.asarray(self.surface_colors).reshape(len(self.surface_colors), -1)[:, :3]
+            if colors.dtype.kind == 'f':
+                colors = np.clip(colors, 0.0, 1.0) * 255
+            self._colors_u8 = colors.astype(np.uint8)
+            self._colors_u8_version = self.colors_version
+        return self._colors_u8
 
     def random_color(self):
         return [random.uniform(0.2, 0.9), random.uniform(0.2, 0.9), random.uniform(0.2, 0.9)]
 
     def group_triangles_into_surfaces(self):
-        # Use BFS to group triangles connected without crossing a feature edge
-        triangles = self.model.vectors
-        n_tris = len(triangles)
-        edge_to_triangles = {}
-        for tri_idx, tri in enumerate(triangles):
-            for i in range(3):
-                v1 = tuple(tri[i])
-                v2 = tuple(tri[(i+1)%3])
-                edge = tuple(sorted([v1, v2]))
-                if edge not in edge_to_triangles:
-                    edge_to_triangles[edge] = []
-                edge_to_triangles[edge].append(tri_idx)
-        visited = [False] * n_tris
-        surfaces = []
-        for tri_idx in range(n_tris):
-            if visited[tri_idx]:
-                continue
-            # Start a new surface
-            surface = set()
-            queue = [tri_idx]
-            while queue:
-                t = queue.pop()
-                if visited[t]:
-                    continue
-                visited[t] = True
-                surface.add(t)
-                tri = triangles[t]
-                for i in range(3):
-                    v1 = tuple(tri[i])
-                    v2 = tuple(tri[(i+1)%3])
-                    edge = tuple(sorted([v1, v2]))
-                    if edge in self.feature_edges:
-                        continue  # Don't cross feature edge
-                    # Add neighboring triangle sharing this edge
-                    for neighbor in edge_to_triangles[edge]:
-                        if not visited[neighbor]:
-                            queue.append(neighbor)
-            surfaces.append(surface)
-        return surfaces
+        # Group triangles connected without crossing a feature edge: link the
+        # triangles around every other edge and label the connected components
+        _, _, edge_triangles, starts, counts = self.mesh_edges()
+        n_tris = len(self.model.vectors)
+        edge_of = np.repeat(np.arange(len(counts)), counts)
+        position = np.arange(len(edge_triangles))
+        # Chain each edge's triangles together (edges with 3+ triangles join them all)
+        linked = (position != starts[edge_of]) & ~self._feature_edge_mask[edge_of]
+        position = position[linked]
+        adjacency = coo_matrix(
+            (np.ones(len(position), dtype=np.int8), (edge_triangles[position - 1], edge_triangles[position])),
+            shape=(n_tris, n_tris),
+        ).tocsr()
+        _, labels = connected_components(adjacency, directed=False)
+        # Number surfaces by their lowest triangle index, in the order triangles are stored
+        _, first_triangle = np.unique(labels, return_index=True)
+        labels = np.argsort(np.argsort(first_triangle))[labels]
+        order = np.argsort(labels, kind='stable')
+        groups = np.split(order, np.cumsum(np.bincount(labels))[:-1])
+        return [set(group.tolist()) for group in groups]
 
     def compute_center_and_size(self):
         min_ = np.min(self.model.vectors.reshape(-1, 3), axis=0)
         max_ = np.max(self.model.vectors.reshape(-1, 3), axis=0)
+        # The mesh never changes, so keep the bounds for the grid and dimensions
+        self.bounds_min, self.bounds_max = min_, max_
         center = (min_ + max_) / 2
         size = np.linalg.norm(max_ - min_)
         return center, size
 
+    def mesh_edges(self):
+        """
+        Index the edges of the mesh, shared by the triangles on either side.
+
+        Vertices are matched by exact position. Returns (vertices, edges,
+        edge_triangles, edge_starts, edge_counts): the unique vertex positions,
+        each unique edge as a sorted pair of vertex ids, the triangle indices
+        grouped by edge, and the offset and size of each edge's group. The mesh
+        never changes, so this is computed once.
+        """
+        if self._mesh_edges is None:
+            triangles = self.model.vectors
+            n_tris = len(triangles)
+            # Unique vertices come back sorted, so id order matches sorting positions
+            vertices, vertex_ids = np.unique(triangles.reshape(-1, 3), axis=0, return_inverse=True)
+            vertex_ids = vertex_ids.reshape(n_tris, 3)
+            # Edge i of a triangle runs from corner i to corner (i + 1) % 3
+            pairs = np.stack((vertex_ids, np.roll(vertex_ids, -1, axis=1)), axis=2).reshape(-1, 2)
+            pairs.sort(axis=1)
+            edges, edge_ids, counts = np.unique(pairs, axis=0, return_inverse=True, return_counts=True)
+            edge_triangles = np.argsort(edge_ids.reshape(-1), kind='stable') // 3
+            starts = np.cumsum(counts) - counts
+            self._mesh_edges = (vertices, edges, edge_triangles, starts, counts)
+        return self._mesh_edges
+
     def compute_feature_edges(self, angle_threshold_degrees=30):
-        # Map edges to the triangles that share them
-        edge_to_triangles = {}
-        triangles = self.model.vectors
+        vertices, edges, edge_triangles, starts, counts = self.mesh_edges()
         normals = self.model.normals
-        for tri_idx, tri in enumerate(triangles):
-            for i in range(3):
-                v1 = tuple(tri[i])
-                v2 = tuple(tri[(i+1)%3])
-                edge = tuple(sorted([v1, v2]))
-                if edge not in edge_to_triangles:
-                    edge_to_triangles[edge] = []
-                edge_to_triangles[edge].append(tri_idx)
-        feature_edges = set()
-        threshold_rad = np.radians(angle_threshold_degrees)
-        for edge, tris in edge_to_triangles.items():
-            if len(tris) == 1:
-                # Boundary edge
-                feature_edges.add(edge)
-            elif len(tris) == 2:
-                n1 = normals[tris[0]]
-                n2 = normals[tris[1]]
-                angle = np.arccos(np.clip(np.dot(n1, n2) / (np.linalg.norm(n1) * np.linalg.norm(n2)), -1.0, 1.0))
-                if angle > threshold_rad:
-                    feature_edges.add(edge)
-        return feature_edges
+        # Boundary edges (one triangle) are always feature edges; edges shared by
+        # exactly two triangles are when the normals differ by more than the threshold
+        is_feature = counts == 1
+        shared = np.flatnonzero(counts == 2)
+        n1 = normals[edge_triangles[starts[shared]]]
+        n2 = normals[edge_triangles[starts[shared] + 1]]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            cos_angle = np.einsum('ij,ij->i', n1, n2) / (np.linalg.norm(n1, axis=1) * np.linalg.norm(n2, axis=1))
+            angle = np.arccos(np.clip(cos_angle, -1.0, 1.0))
+        is_feature[shared] = angle > np.radians(angle_threshold_degrees)
+        # Kept per edge so group_triangles_into_surfaces() needn't look up positions
+        self._feature_edge_mask = is_feature
+        return {(tuple(v1), tuple(v2)) for v1, v2 in vertices[edges[is_feature]].tolist()}
 
     def update_camera(self):
         glLoadIdentity()
-        heading_rad = np.radians(self.camera_heading)
-        pitch_rad = np.radians(self.camera_pitch)
-        x = self.camera_distance * np.sin(heading_rad) * np.cos(pitch_rad)
-        y = -self.camera_distance * np.cos(heading_rad) * np.cos(pitch_rad)
-        z = self.camera_distance * np.sin(pitch_rad)
-        gluLookAt(x, y, z, 0, 0, 0, 0, 0, 1)
+        # Orbit by rotating the world about the origin instead of gluLookAt: back
+        # off by the distance, tilt by the pitch, then spin by the heading. This is
+        # the same matrix as looking at the origin from the orbit position with +Z
+        # up, but GL composes it without any trig or vector math in Python.
+        glTranslated(0.0, 0.0, -self.camera_distance)
+        glRotated(self.camera_pitch - 90.0, 1.0, 0.0, 0.0)
+        glRotated(-self.camera_heading, 0.0, 0.0, 1.0)
 
     def get_ray_from_mouse(self, mouse_pos):
         viewport = glGetIntegerv(GL_VIEWPORT)
@@ -254,47 +327,79 @@ class Render:
         ray_dir = ray_dir / np.linalg.norm(ray_dir)
         return ray_origin, ray_dir
 
-    def ray_triangle_intersect(self, ray_origin, ray_dir, triangle):
-        # Möller–Trumbore intersection
-        v0, v1, v2 = triangle
+    def compute_surface_bounds(self):
+        """Compute an axis-aligned bounding box per surface, used to cull ray picks"""
+        n_surfaces = len(self.surfaces)
+        self._triangle_surface = np.empty(len(self.model.vectors), dtype=np.intp)
+        for surf_idx, surf in enumerate(self.surfaces):
+            self._triangle_surface[list(surf)] = surf_idx
+        order = np.argsort(self._triangle_surface, kind='stable')
+        counts = np.bincount(self._triangle_surface, minlength=n_surfaces)
+        offsets = np.cumsum(counts) - counts
+        # Triangles sorted by surface and where each surface starts, for per-surface reductions
+        self._surface_order, self._surface_offsets = order, offsets
+        triangles = self.model.vectors[order]
+        # Pad the boxes slightly so flat (zero-thickness) surfaces survive rounding
+        pad = 1e-6 * max(self.size, 1e-12)
+        self._surface_min = np.minimum.reduceat(triangles.min(axis=1), offsets).astype(np.float64) - pad
+        self._surface_max = np.maximum.reduceat(triangles.max(axis=1), offsets).astype(np.float64) + pad
+
+    def ray_hits_surface_bounds(self, ray_origin, ray_dir):
+        """Slab test of a ray against every surface's bounding box; returns a bool mask"""
+        with np.errstate(divide='ignore', invalid='ignore'):
+            inv_dir = 1.0 / ray_dir
+            t1 = (self._surface_min - ray_origin) * inv_dir
+            t2 = (self._surface_max - ray_origin) * inv_dir
+        # 0 * inf (ray in a slab's plane, parallel to it) gives NaN: don't cull on that axis
+        parallel = np.isnan(t1) | np.isnan(t2)
+        t_near = np.where(parallel, -np.inf, np.minimum(t1, t2)).max(axis=1)
+        t_far = np.where(parallel, np.inf, np.maximum(t1, t2)).min(axis=1)
+        return (t_near <= t_far) & (t_far >= 0.0)
+
+    def ray_triangle_intersect(self, ray_origin, ray_dir):
+        """
+        Intersect a ray with the model's triangles at once (Möller–Trumbore).
+
+        Only triangles of surfaces whose bounding box the ray passes through are
+        tested. Returns the index of the nearest triangle hit, or None on a miss.
+        """
         eps = 1e-8
-        edge1 = v1 - v0
-        edge2 = v2 - v0
-        h = np.cross(ray_dir, edge2)
-        a = np.dot(edge1, h)
-        if -eps < a < eps:
-            return None  # Parallel
-        f = 1.0 / a
-        s = ray_origin - v0
-        u = f * np.dot(s, h)
-        if u < 0.0 or u > 1.0:
+        candidates = np.flatnonzero(self.ray_hits_surface_bounds(ray_origin, ray_dir)[self._triangle_surface])
+        if len(candidates) == 0:
             return None
-        q = np.cross(s, edge1)
-        v = f * np.dot(ray_dir, q)
-        if v < 0.0 or u + v > 1.0:
+        edge1, edge2 = self._tri_edge1[candidates], self._tri_edge2[candidates]
+        h = np.cross(ray_dir, edge2)
+        a = np.einsum('ij,ij->i', edge1, h)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            f = 1.0 / a
+            s = ray_origin - self._tri_v0[candidates]
+            u = f * np.einsum('ij,ij->i', s, h)
+            q = np.cross(s, edge1)
+            v = f * (q @ ray_dir)
+            t = f * np.einsum('ij,ij->i', edge2, q)
+        # Rays parallel to a triangle (|a| < eps) never count as a hit
+        hit = (np.abs(a) >= eps) & (u >= 0.0) & (u <= 1.0) & (v >= 0.0) & (u + v <= 1.0) & (t > eps)
+        if not hit.any():
             return None
-        t = f * np.dot(edge2, q)
-        if t > eps:
-            return t
-        return None
+        return int(candidates[np.argmin(np.where(hit, t, np.inf))])
+
+    def pick_triangle(self, mouse_pos):
+        """Return the index of the model triangle under the mouse, or None"""
+        # Ensure OpenGL matrices are up-to-date for ray picking
+        glPushMatrix()
+        self.apply_model_transform()
+        ray_origin, ray_dir = self.get_ray_from_mouse(mouse_pos)
+        glPopMatrix()
+        return self.ray_triangle_intersect(ray_origin, ray_dir)
 
     def draw_measurement_grid(self):
         """
         Draw a measurement grid on the floor to show scale.
         Grid spacing is 1 meter in scaled space.
+        Drawn in model space, so apply_model_transform() must already be applied.
         """
-        glPushMatrix()
-        self.update_camera()
-        
-        # Apply same scaling as model
-        glScalef(self.model_scale_factor, self.model_scale_factor, self.model_scale_factor)
-        
-        # Apply same translation as model to align the grid
-        glTranslatef(-self.center[0], -self.center[1], -self.center[2])
-        
         # Get model bounds to position grid appropriately
-        min_ = np.min(self.model.vectors.reshape(-1, 3), axis=0)
-        max_ = np.max(self.model.vectors.reshape(-1, 3), axis=0)
+        min_, max_ = self.bounds_min, self.bounds_max
         
         # Position grid exactly at the bottom of the model (min Z)
         grid_z = min_[2]
@@ -346,139 +451,102 @@ class Render:
             glVertex3f(grid_center_x + offset, grid_center_y - grid_size, grid_z)
             glVertex3f(grid_center_x + offset, grid_center_y + grid_size, grid_z)
             glEnd()
-        
-        glPopMatrix()
     
-    def draw_model(self):
-        glPushMatrix()
+    def apply_model_transform(self):
+        """Load the camera view followed by the model's scale and centering"""
         self.update_camera()
-        
-        # Apply model scaling
         glScalef(self.model_scale_factor, self.model_scale_factor, self.model_scale_factor)
-        
         glTranslatef(-self.center[0], -self.center[1], -self.center[2])
-        triangles = self.model.vectors
-        normals = self.model.normals
-        
-        # Calculate surface bounds for textured surfaces
-        surface_bounds = {}
-        for surf_idx, material in enumerate(self.surface_materials):
-            if material and self.texture_id:
-                # Get all triangles in this surface
-                surface_triangles = [tri_idx for tri_idx, s_idx in self.triangle_to_surface.items() if s_idx == surf_idx]
-                
-                # Calculate bounds using the same coordinate system as texture mapping
-                if surface_triangles:
-                    # Use the first triangle's normal as reference
-                    ref_normal = normals[surface_triangles[0]]
-                    ref_normal = ref_normal / np.linalg.norm(ref_normal)
-                    
-                    # Get the dominant axis of the normal
-                    abs_normal = np.abs(ref_normal)
-                    dominant_axis = np.argmax(abs_normal)
-                    
-                    # Project all vertices using the same method as texture mapping
-                    tex_coords_x = []
-                    tex_coords_y = []
-                    for tri_idx in surface_triangles:
-                        triangle = triangles[tri_idx]
-                        for vertex in triangle:
-                            if dominant_axis == 0:  # Normal mostly in X direction
-                                tex_x = vertex[1]  # Y coordinate
-                                tex_y = vertex[2]  # Z coordinate
-                            elif dominant_axis == 1:  # Normal mostly in Y direction
-                                tex_x = vertex[0]  # X coordinate
-                                tex_y = vertex[2]  # Z coordinate
-                            else:  # Normal mostly in Z direction
-                                tex_x = vertex[0]  # X coordinate
-                                tex_y = vertex[1]  # Y coordinate
-                            tex_coords_x.append(tex_x)
-                            tex_coords_y.append(tex_y)
-                    
-                    surface_bounds[surf_idx] = (min(tex_coords_x), max(tex_coords_x), 
-                                               min(tex_coords_y), max(tex_coords_y))
-        
+    
+    def update_model_buffers(self):
+        """Re-upload vertex colors and the draw order when surface colors or materials change"""
+        state = (self.colors_version, tuple(self.surface_materials), self.transparent_mode, bool(self.texture_id))
+        if state == self._draw_state:
+            return
+        self._draw_state = state
+        _, _, color_vbo, _, index_vbo = self._model_buffers
+
+        # Textured triangles are drawn first, then the plain colored ones. A surface
+        # marked textured with no texture loaded is not drawn at all.
+        textured_surfaces = np.array([bool(material) for material in self.surface_materials])
+        textured = textured_surfaces[self._triangle_surface]
+        textured_triangles = np.flatnonzero(textured) if self.texture_id else np.empty(0, dtype=np.intp)
+        colored_triangles = np.flatnonzero(~textured)
+        triangles = np.concatenate((textured_triangles, colored_triangles))
+        indices = (triangles[:, None] * 3 + np.arange(3)).astype(np.uint32).ravel()
+        self._n_textured_indices = 3 * len(textured_triangles)
+        self._n_colored_indices = 3 * len(colored_triangles)
+        if len(indices):
+            glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, index_vbo)
+            glBufferData(GL_ELEMENT_ARRAY_BUFFER, indices.nbytes, indices, GL_DYNAMIC_DRAW)
+            glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, 0)
+
+        n_surfaces = len(self.surface_colors)
+        surface_rgba = np.empty((n_surfaces, 4), dtype=np.float32)
+        surface_rgba[:, :3] = np.asarray(self.surface_colors, dtype=np.float32).reshape(n_surfaces, -1)[:, :3]
+        surface_rgba[:, 3] = 0.3 if self.transparent_mode else 1.0
+        vertex_colors = np.repeat(surface_rgba[self._triangle_surface], 3, axis=0)
+        glBindBuffer(GL_ARRAY_BUFFER, color_vbo)
+        glBufferData(GL_ARRAY_BUFFER, vertex_colors.nbytes, vertex_colors, GL_DYNAMIC_DRAW)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+
+    def draw_model(self):
+        """Draw the model in model space (apply_model_transform() must already be applied)"""
+        self.update_model_buffers()
+        vertex_vbo, texcoord_vbo, color_vbo, edge_vbo, index_vbo = self._model_buffers
+
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glBindBuffer(GL_ARRAY_BUFFER, vertex_vbo)
+        glVertexPointer(3, GL_FLOAT, 0, None)
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, index_vbo)
+
         # Draw textured surfaces first
-        for tri_idx, triangle in enumerate(triangles):
-            surf_idx = self.triangle_to_surface[tri_idx]
-            material = self.surface_materials[surf_idx]
-            
-            if material and self.texture_id:
-                glEnable(GL_TEXTURE_2D)
-                glBindTexture(GL_TEXTURE_2D, self.texture_id)
-                glColor4f(1.0, 1.0, 1.0, 0.3 if self.transparent_mode else 1.0)  # White for texture
-                
-                # Get the normal for this triangle
-                normal = normals[tri_idx]
-                
-                # Get surface bounds for this surface
-                bounds = surface_bounds.get(surf_idx)
-                
-                glBegin(GL_TRIANGLES)
-                for i, vertex in enumerate(triangle):
-                    # Project texture coordinates based on surface normal and bounds
-                    tex_coords = self.get_texture_coords_from_normal(vertex, normal, bounds)
-                    glTexCoord2f(tex_coords[0], tex_coords[1])
-                    glVertex3fv(vertex)
-                glEnd()
-        
-        # Draw non-textured surfaces
-        for tri_idx, triangle in enumerate(triangles):
-            surf_idx = self.triangle_to_surface[tri_idx]
-            material = self.surface_materials[surf_idx]
-            
-            if not material:
-                glDisable(GL_TEXTURE_2D)
-                color = self.surface_colors[surf_idx]
-                alpha = 0.3 if self.transparent_mode else 1.0
-                glColor4f(color[0], color[1], color[2], alpha)
-                
-                glBegin(GL_TRIANGLES)
-                for vertex in triangle:
-                    glVertex3fv(vertex)
-                glEnd()
-        
-        # Disable texturing for edges
+        if self._n_textured_indices:
+            glEnable(GL_TEXTURE_2D)
+            glBindTexture(GL_TEXTURE_2D, self.texture_id)
+            glColor4f(1.0, 1.0, 1.0, 0.3 if self.transparent_mode else 1.0)  # White for texture
+            glEnableClientState(GL_TEXTURE_COORD_ARRAY)
+            glBindBuffer(GL_ARRAY_BUFFER, texcoord_vbo)
+            glTexCoordPointer(2, GL_FLOAT, 0, None)
+            glDrawElements(GL_TRIANGLES, self._n_textured_indices, GL_UNSIGNED_INT, None)
+            glDisableClientState(GL_TEXTURE_COORD_ARRAY)
+
+        # Draw non-textured surfaces, colored per vertex
         glDisable(GL_TEXTURE_2D)
-        
+        if self._n_colored_indices:
+            glEnableClientState(GL_COLOR_ARRAY)
+            glBindBuffer(GL_ARRAY_BUFFER, color_vbo)
+            glColorPointer(4, GL_FLOAT, 0, None)
+            glDrawElements(GL_TRIANGLES, self._n_colored_indices, GL_UNSIGNED_INT,
+                           ctypes.c_void_p(4 * self._n_textured_indices))
+            glDisableClientState(GL_COLOR_ARRAY)
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, 0)
+
         # Draw only feature/boundary edges in black
         glColor3f(0, 0, 0)
         glLineWidth(3)
-        glBegin(GL_LINES)
-        for v1, v2 in self.feature_edges:
-            glVertex3fv(v1)
-            glVertex3fv(v2)
-        glEnd()
-        glPopMatrix()
+        if self._n_edge_vertices:
+            glBindBuffer(GL_ARRAY_BUFFER, edge_vbo)
+            glVertexPointer(3, GL_FLOAT, 0, None)
+            glDrawArrays(GL_LINES, 0, self._n_edge_vertices)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        glDisableClientState(GL_VERTEX_ARRAY)
 
     def check_keybinds(self, event):
-        if event.type == pygame.QUIT:
-            self.running = False
-        elif event.type == pygame.MOUSEBUTTONDOWN:
+        if event.type == pygame.MOUSEBUTTONDOWN:
             if event.button == 1:  # Left click - start drag or prepare for texture application
+                self._apply_drag()  # Finish a drag released earlier in this frame
                 self.mouse_down = True
                 self.last_mouse_pos = event.pos
                 self.mouse_down_pos = event.pos  # Remember where we pressed
             elif event.button == 3:  # Right click - change color immediately
-                # Ensure OpenGL matrices are up-to-date for ray picking
-                glPushMatrix()
-                self.update_camera()
-                glScalef(self.model_scale_factor, self.model_scale_factor, self.model_scale_factor)
-                glTranslatef(-self.center[0], -self.center[1], -self.center[2])
-                ray_origin, ray_dir = self.get_ray_from_mouse(event.pos)
-                glPopMatrix()
-                triangles = self.model.vectors
-                min_t = float('inf')
-                hit_tri = None
-                for tri_idx, triangle in enumerate(triangles):
-                    t = self.ray_triangle_intersect(ray_origin, ray_dir, triangle)
-                    if t is not None and t < min_t:
-                        min_t = t
-                        hit_tri = tri_idx
+                hit_tri = self.pick_triangle(event.pos)
                 if hit_tri is not None:
                     surf_idx = self.triangle_to_surface[hit_tri]
                     self.surface_colors[surf_idx] = self.random_color()
+                    self.colors_version += 1
                     self.surface_materials[surf_idx] = None  # Remove texture when changing color
+                    self.needs_redraw = True
                     print(f"Changed color of surface {surf_idx}")
         elif event.type == pygame.MOUSEBUTTONUP:
             if event.button == 1:
@@ -491,52 +559,58 @@ class Render:
                     
                     # If mouse moved less than 5 pixels, treat as a click
                     if drag_distance < 5:
-                        # Ensure OpenGL matrices are up-to-date for ray picking
-                        glPushMatrix()
-                        self.update_camera()
-                        glScalef(self.model_scale_factor, self.model_scale_factor, self.model_scale_factor)
-                        glTranslatef(-self.center[0], -self.center[1], -self.center[2])
-                        ray_origin, ray_dir = self.get_ray_from_mouse(event.pos)
-                        glPopMatrix()
-                        triangles = self.model.vectors
-                        min_t = float('inf')
-                        hit_tri = None
-                        for tri_idx, triangle in enumerate(triangles):
-                            t = self.ray_triangle_intersect(ray_origin, ray_dir, triangle)
-                            if t is not None and t < min_t:
-                                min_t = t
-                                hit_tri = tri_idx
+                        hit_tri = self.pick_triangle(event.pos)
                         if hit_tri is not None:
                             surf_idx = self.triangle_to_surface[hit_tri]
                             self.surface_materials[surf_idx] = True  # Apply texture
+                            self.needs_redraw = True
                             print(f"Applied texture to surface {surf_idx} (texture_id: {self.texture_id})")
                 
                 self.mouse_down_pos = None  # Reset
         elif event.type == pygame.MOUSEMOTION:
             if self.mouse_down and self.last_mouse_pos:
-                x, y = event.pos
-                last_x, last_y = self.last_mouse_pos
-                dx = x - last_x
-                dy = y - last_y
-                self.camera_heading -= dx * 0.5
-                self.camera_pitch += dy * 0.5
-                self.camera_pitch = max(-89, min(89, self.camera_pitch))
-                self.last_mouse_pos = (x, y)
+                # Orbit by the total drag once per frame, in update()
+                self._drag_pos = event.pos
         elif event.type == pygame.MOUSEWHEEL:
-            if event.y > 0:
-                self.camera_distance = max(self.min_distance, self.camera_distance - 0.1 * self.size)
-            else:
-                self.camera_distance = min(self.max_distance, self.camera_distance + 0.1 * self.size)
+            # Zoom steps are accumulated and applied once per frame in update()
+            self._pending_zoom_steps += 1 if event.y > 0 else -1
         elif event.type == pygame.KEYDOWN:
             if event.key == pygame.K_t:
                 self.transparent_mode = not self.transparent_mode
+                self.needs_redraw = True
                 print(f"Transparency mode: {'ON' if self.transparent_mode else 'OFF'}")
             elif event.key == pygame.K_r:
                 # Reset all surfaces to default
                 self.surface_colors = [self.default_surface_color[:] for _ in self.surfaces]
+                self.colors_version += 1
                 self.surface_materials = [None for _ in self.surfaces]
+                self.needs_redraw = True
                 print("Reset all surfaces to default")
 
+    def _apply_drag(self):
+        """Orbit the camera by the drag distance since the last applied position"""
+        if self._drag_pos is None:
+            return
+        x, y = self._drag_pos
+        last_x, last_y = self.last_mouse_pos
+        self._drag_pos = None
+        # The cursor came back to where the last drag left it: nothing to orbit or redraw
+        if x == last_x and y == last_y:
+            return
+        self.camera_heading -= (x - last_x) * 0.5
+        self.camera_pitch = max(-89, min(89, self.camera_pitch + (y - last_y) * 0.5))
+        self.last_mouse_pos = (x, y)
+        self.needs_redraw = True
+
+    def update(self):
+        """Apply input accumulated since the last frame"""
+        self._apply_drag()
+        if self._pending_zoom_steps:
+            distance = self.camera_distance - self._pending_zoom_steps * 0.1 * self.size
+            self.camera_distance = max(self.min_distance, min(self.max_distance, distance))
+            self._pending_zoom_steps = 0
+            self.needs_redraw = True
+
     def draw_scene(self):
         # Save current OpenGL state to avoid interfering with pygame_gui rendering
         glPushAttrib(GL_VIEWPORT_BIT | GL_SCISSOR_BIT)
@@ -549,32 +623,22 @@ class Render:
         # This method will be called by the GUI class to render the 3D model
         glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
         
+        # The grid and the model share one transform, so set it up once for both
+        glPushMatrix()
+        self.apply_model_transform()
+        
         # Draw measurement grid first (behind the model)
         self.draw_measurement_grid()
         
         # Draw the 3D model
         self.draw_model()
+        glPopMatrix()
         
         glDisable(GL_SCISSOR_TEST)
         
         # Restore OpenGL state
         glPopAttrib()
         
-    def run(self):
-        # The main loop is now controlled by the GUI class
-        # This method is no longer needed and can be removed or left empty
-        pass
-        # self.running = True
-        # clock = pygame.time.Clock()
-        # while self.running:
-        #     for event in pygame.event.get():
-        #         self.check_keybinds(event)
-        #     glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
-        #     self.draw_model()
-        #     pygame.display.flip()
-        #     clock.tick(60)
-        # pygame.quit()
-    
     def get_walls_for_acoustic(self):
         """
         Return wall information for acoustic simulation.
@@ -596,9 +660,14 @@ class Render:
         Return flattened vertex array for acoustic simulation.
         Returns vertices in the format expected by acoustic simulation.
         """
-        # self.model.vectors is shape (n_triangles, 3, 3)
-        # Flatten to (n_triangles * 3, 3) for vertex-by-vertex access
-        return self.model.vectors.reshape(-1, 3)
+        # self.model.vectors is shape (n_triangles, 3, 3), a strided view into the
+        # STL records. Flatten to (n_triangles * 3, 3) for vertex-by-vertex access,
+        # packed into one contiguous float32 array (built once, the mesh is static)
+        if self._model_vertices is None:
+            self._model_vertices = np.ascontiguousarray(
+                self.model.vectors.reshape(-1, 3), dtype=np.float32
+            )
+        return self._model_vertices
     
     def update_projection(self):
         """
@@ -638,7 +707,9 @@ class Render:
         self.max_distance = 5 * scaled_size
         
         # Update projection clipping planes for the new scale
-        self.update_projection()
+        if self.gl_ready:
+            self.update_projection()
+        self.needs_redraw = True
         
         print(f"Scale factor set to {factor:.2f}x (model size: {scaled_size:.2f} units)")
     
@@ -647,9 +718,7 @@ class Render:
         Get the real-world dimensions of the model in meters.
         Returns (width, height, depth) tuple.
         """
-        min_ = np.min(self.model.vectors.reshape(-1, 3), axis=0)
-        max_ = np.max(self.model.vectors.reshape(-1, 3), axis=0)
-        dimensions = (max_ - min_) * self.model_scale_factor
+        dimensions = (self.bounds_max - self.bounds_min) * self.model_scale_factor
         return dimensions
     
     def get_real_world_size(self):